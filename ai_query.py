@@ -785,7 +785,7 @@ class AIQueryEngine:
         last_purchase = customer_data['date'].max()
         
         # Get top items
-        top_items = customer_data.groupby('item_name')['total'].sum().sort_values(ascending=False).head(5)
+        top_items = customer_data.groupby('item_name', observed=True)['total'].sum().sort_values(ascending=False).head(5)
         
         answer_text = f"**Customer: {customer_name}**\n\n"
         answer_text += f"Total Spent: ${total_spent:,.2f}\n"
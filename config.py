@@ -162,6 +162,10 @@ TRANSLATIONS = {
         'all_products': 'All Products',
         'no_refund_transactions': 'No refund transactions found.',
         'download_refund_data': 'Download Refund Data',
+        'rows_to_show': 'Rows to show',
+        'showing_refund_rows': 'Showing {shown} of {total} refund transactions',
+        'full_resolution': 'Full resolution',
+        'showing_representative_points': 'Showing {shown} representative of {total} {period} points',
         'refund_amount': 'Refund Amount',
         'refund_quantity': 'Refund Quantity',
         'no_data_available': 'No data available',
@@ -212,6 +216,7 @@ TRANSLATIONS = {
         'overdue_refills_lost': 'Overdue Refills & Lost Customers',
         'order_value_price_predictions': 'Order Value & Price Predictions',
         'detailed_anomaly_breakdown': 'Detailed Anomaly Breakdown',
+        'select_anomaly_day': 'Select an anomalous day',
         'display_controls': 'Display Controls',
         'no_data_monthly': 'No data available for monthly analysis',
         'no_monthly_trend': 'No monthly trend data available',
@@ -488,6 +493,8 @@ TRANSLATIONS = {
         'generate_report': 'Generate Report',
         'generating_report': 'Generating report...',
         'download_csv': 'Download CSV',
+        'prepare_csv': 'Prepare CSV',
+        'download_parquet': 'Download Parquet',
         'report_generated': 'Report generated successfully!',
         
         # Common buttons and actions
@@ -621,6 +628,10 @@ TRANSLATIONS = {
         'all_products': 'كل المنتجات',
         'no_refund_transactions': 'لم يتم العثور على معاملات مرتجعات.',
         'download_refund_data': 'تحميل بيانات المرتجعات',
+        'rows_to_show': 'عدد الصفوف المعروضة',
+        'showing_refund_rows': 'عرض {shown} من أصل {total} معاملة مرتجع',
+        'full_resolution': 'الدقة الكاملة',
+        'showing_representative_points': 'عرض {shown} نقطة ممثلة من أصل {total} نقطة ({period})',
         'refund_amount': 'قيمة المرتجع',
         'refund_quantity': 'كمية المرتجعات',
         'no_data_available': 'لا توجد بيانات متاحة',
@@ -671,6 +682,7 @@ TRANSLATIONS = {
         'overdue_refills_lost': 'إعادة الشراء المتأخرة والعملاء المفقودون',
         'order_value_price_predictions': 'توقعات قيمة الطلب والأسعار',
         'detailed_anomaly_breakdown': 'تفصيل الحالات الشاذة',
+        'select_anomaly_day': 'اختر يوماً شاذاً',
         'display_controls': 'عناصر التحكم بالعرض',
         'no_data_monthly': 'لا توجد بيانات متاحة للتحليل الشهري',
         'no_monthly_trend': 'لا توجد بيانات اتجاه شهرية متاحة',
@@ -947,6 +959,8 @@ TRANSLATIONS = {
         'generate_report': 'إنشاء التقرير',
         'generating_report': 'جاري إنشاء التقرير...',
         'download_csv': 'تحميل CSV',
+        'prepare_csv': 'تجهيز CSV',
+        'download_parquet': 'تحميل Parquet',
         'report_generated': 'تم إنشاء التقرير بنجاح!',
         
         # Common buttons and actions
@@ -1137,6 +1151,12 @@ COLUMN_TRANSLATIONS = {
         'revenue_change_pct': 'Revenue Δ%',
         'orders_change_pct': 'Orders Δ%',
         'quantity_change_pct': 'Quantity Δ%',
+        'revenue_zscore': 'Revenue Z-Score',
+        'orders_zscore': 'Orders Z-Score',
+        'quantity_zscore': 'Quantity Z-Score',
+        'revenue_signal': 'Revenue Signal',
+        'orders_signal': 'Orders Signal',
+        'quantity_signal': 'Quantity Signal',
     },
     'ar': {
         # Common columns
@@ -1258,6 +1278,12 @@ COLUMN_TRANSLATIONS = {
         'revenue_change_pct': 'Δ٪ الإيرادات',
         'orders_change_pct': 'Δ٪ الطلبات',
         'quantity_change_pct': 'Δ٪ الكمية',
+        'revenue_zscore': 'الدرجة المعيارية للإيرادات',
+        'orders_zscore': 'الدرجة المعيارية للطلبات',
+        'quantity_zscore': 'الدرجة المعيارية للكمية',
+        'revenue_signal': 'مؤشر الإيرادات',
+        'orders_signal': 'مؤشر الطلبات',
+        'quantity_signal': 'مؤشر الكمية',
     }
 }
 
@@ -55,6 +55,10 @@ class CrossSellAnalyzer:
         self._cooccurrence_cache: Optional[pd.DataFrame] = None
         self._order_item_sets_cache: Optional[Dict] = None
         self._order_totals_cache: Optional[Dict] = None
+        self._bundle_suggestions_cache: Dict[Tuple, pd.DataFrame] = {}
+        self._affinity_cache: Optional[pd.DataFrame] = None
+        self._complementary_cache: Dict[Tuple[str, int], pd.DataFrame] = {}
+        self._basket_insights_cache: Optional[Dict] = None
         
         # Verify order_id grouping
         unique_orders = self.data['order_id'].nunique()
@@ -89,7 +93,7 @@ class CrossSellAnalyzer:
         # Create basket: each order_id with list of products
         # NOTE: order_id comes from Receipt column in original data
         # Convert all item names to strings to handle mixed types
-        baskets = self.data.groupby('order_id')['item_name'].apply(
+        baskets = self.data.groupby('order_id', observed=True)['item_name'].apply(
             lambda x: [str(item) for item in x]
         ).reset_index()
         
@@ -112,7 +116,7 @@ class CrossSellAnalyzer:
             Dictionary with grouping statistics and sample orders
         """
         # Group items by order_id
-        order_groups = self.data.groupby('order_id').agg({
+        order_groups = self.data.groupby('order_id', observed=True).agg({
             'item_name': lambda x: list(x),
             'customer_name': 'first',
             'date': 'first',
@@ -411,7 +415,7 @@ class CrossSellAnalyzer:
         auto_adjust: bool = True
     ) -> pd.DataFrame:
         """
-        Suggest product bundles based on frequent itemsets with enhanced analytics.
+        Suggest product bundles based on frequent itemsets with enhanced analytics. (CACHED)
         OPTIMIZED: Uses vectorized operations for better performance.
         
         Args:
@@ -420,6 +424,24 @@ class CrossSellAnalyzer:
             n: Number of bundles to return
             auto_adjust: Use adaptive thresholds
         """
+        # Return cached result if available
+        cache_key = (min_items, max_items, n, auto_adjust)
+        if cache_key in self._bundle_suggestions_cache:
+            return self._bundle_suggestions_cache[cache_key]
+        
+        self._bundle_suggestions_cache[cache_key] = self._build_bundle_suggestions(
+            min_items, max_items, n, auto_adjust
+        )
+        return self._bundle_suggestions_cache[cache_key]
+    
+    def _build_bundle_suggestions(
+        self,
+        min_items: int,
+        max_items: int,
+        n: int,
+        auto_adjust: bool
+    ) -> pd.DataFrame:
+        """Compute bundle suggestions for get_bundle_suggestions."""
         frequent_itemsets = self.find_frequent_itemsets(auto_adjust=auto_adjust)
         
         if len(frequent_itemsets) == 0:
@@ -441,9 +463,9 @@ class CrossSellAnalyzer:
         
         # OPTIMIZATION: Pre-compute order-item mapping for faster lookups (with caching)
         if self._order_item_sets_cache is None:
-            self._order_item_sets_cache = self.data.groupby('order_id')['item_name'].apply(set).to_dict()
+            self._order_item_sets_cache = self.data.groupby('order_id', observed=True)['item_name'].apply(set).to_dict()
         if self._order_totals_cache is None:
-            self._order_totals_cache = self.data.groupby('order_id')['total'].sum().to_dict()
+            self._order_totals_cache = self.data.groupby('order_id', observed=True)['total'].sum().to_dict()
         
         order_item_sets = self._order_item_sets_cache
         order_totals = self._order_totals_cache
@@ -500,7 +522,7 @@ class CrossSellAnalyzer:
         OPTIMIZED: Uses pre-computed mappings and efficient data structures.
         """
         # OPTIMIZED: Pre-compute order items as sets and totals
-        order_data = self.data.groupby('order_id').agg({
+        order_data = self.data.groupby('order_id', observed=True).agg({
             'item_name': lambda x: list(set(x)),
             'total': 'sum'
         })
@@ -556,11 +578,15 @@ class CrossSellAnalyzer:
     
     def analyze_product_affinity(self) -> pd.DataFrame:
         """
-        Calculate product affinity scores for all product pairs.
+        Calculate product affinity scores for all product pairs. (CACHED)
         OPTIMIZED: Uses cached co-occurrence data.
         
         Affinity = How often products are bought together relative to their individual frequencies
         """
+        # Return cached result if available
+        if self._affinity_cache is not None:
+            return self._affinity_cache
+        
         if self.association_rules_df is None:
             self.generate_association_rules()
         
@@ -592,11 +618,15 @@ class CrossSellAnalyzer:
                 })
         
         if len(affinity_data) == 0:
-            return pd.DataFrame()
+            self._affinity_cache = pd.DataFrame()
+            return self._affinity_cache
         
         affinity_df = pd.DataFrame(affinity_data)
         affinity_df = affinity_df.sort_values('lift', ascending=False)
         
+        # Cache the result
+        self._affinity_cache = affinity_df
+        
         return affinity_df
     
     def _calculate_cooccurrence(self) -> pd.DataFrame:
@@ -605,7 +635,7 @@ class CrossSellAnalyzer:
         OPTIMIZED: Uses vectorized operations and numpy for performance.
         """
         # OPTIMIZED: Get unique items per order in one pass
-        orders = self.data.groupby('order_id')['item_name'].apply(
+        orders = self.data.groupby('order_id', observed=True)['item_name'].apply(
             lambda x: list(set(str(item) for item in x))
         )
         total_orders = len(orders)
@@ -689,10 +719,19 @@ class CrossSellAnalyzer:
     
     def get_complementary_products(self, product_name: str, n: int = 5) -> pd.DataFrame:
         """
-        Find complementary products for a given product using multiple methods.
+        Find complementary products for a given product using multiple methods. (CACHED)
         
         Complementary = Products frequently bought together
         """
+        # Return cached result if available
+        cache_key = (product_name, n)
+        if cache_key not in self._complementary_cache:
+            self._complementary_cache[cache_key] = self._find_complementary_products(product_name, n)
+        
+        return self._complementary_cache[cache_key]
+    
+    def _find_complementary_products(self, product_name: str, n: int) -> pd.DataFrame:
+        """Compute complementary products for get_complementary_products."""
         # Method 1: Try affinity analysis
         affinity = self.analyze_product_affinity()
         
@@ -734,7 +773,7 @@ class CrossSellAnalyzer:
         """
         # OPTIMIZED: Use cached order-item mapping
         if self._order_item_sets_cache is None:
-            self._order_item_sets_cache = self.data.groupby('order_id')['item_name'].apply(set).to_dict()
+            self._order_item_sets_cache = self.data.groupby('order_id', observed=True)['item_name'].apply(set).to_dict()
         
         # Find orders containing the target product
         orders_with_product = [
@@ -755,7 +794,7 @@ class CrossSellAnalyzer:
             return pd.DataFrame()
         
         # Count co-occurrences
-        cooccurrence = related_items.groupby('item_name').agg({
+        cooccurrence = related_items.groupby('item_name', observed=True).agg({
             'order_id': 'nunique',
             'total': 'sum'
         }).reset_index()
@@ -770,14 +809,12 @@ class CrossSellAnalyzer:
         all_orders = len(self._order_item_sets_cache)
         
         # Pre-compute product frequencies
-        product_freq = self.data.groupby('item_name')['order_id'].nunique().to_dict()
+        product_freq = self.data.groupby('item_name', observed=True)['order_id'].nunique()
+        freq = product_freq.reindex(cooccurrence['complementary_product'].astype(object)).fillna(0).to_numpy()
         
-        cooccurrence['lift'] = cooccurrence['complementary_product'].apply(
-            lambda prod: (
-                cooccurrence.loc[cooccurrence['complementary_product'] == prod, 'times_bought_together'].values[0] /
-                ((total_orders_with_product / all_orders) * (product_freq.get(prod, 0) / all_orders) * all_orders)
-            ) if ((total_orders_with_product / all_orders) * (product_freq.get(prod, 0) / all_orders) * all_orders) > 0 else 0
-        )
+        expected = (total_orders_with_product / all_orders) * (freq / all_orders) * all_orders
+        times = cooccurrence['times_bought_together'].to_numpy(dtype=float)
+        cooccurrence['lift'] = np.divide(times, expected, out=np.zeros_like(times), where=expected > 0)
         
         cooccurrence['confidence'] = cooccurrence['support']
         
@@ -790,7 +827,7 @@ class CrossSellAnalyzer:
         """Analyze associations at the category level."""
         # Create category-level transactions
         # Convert all categories to strings to handle mixed types
-        category_orders = self.data.groupby('order_id')['category'].apply(
+        category_orders = self.data.groupby('order_id', observed=True)['category'].apply(
             lambda x: [str(item) for item in set(x)]
         ).reset_index()
         
@@ -827,9 +864,13 @@ class CrossSellAnalyzer:
         ]
     
     def get_customer_basket_insights(self) -> Dict:
-        """Get insights about customer shopping baskets."""
+        """Get insights about customer shopping baskets. (CACHED)"""
+        # Return cached result if available
+        if self._basket_insights_cache is not None:
+            return self._basket_insights_cache
+        
         # Calculate basket statistics
-        basket_stats = self.data.groupby('order_id').agg({
+        basket_stats = self.data.groupby('order_id', observed=True).agg({
             'item_name': 'nunique',
             'total': 'sum',
             'quantity': 'sum'
@@ -837,7 +878,8 @@ class CrossSellAnalyzer:
         
         basket_stats.columns = ['order_id', 'unique_items', 'basket_value', 'total_quantity']
         
-        return {
+        # Cache the result
+        self._basket_insights_cache = {
             'avg_items_per_basket': basket_stats['unique_items'].mean(),
             'median_items_per_basket': basket_stats['unique_items'].median(),
             'avg_basket_value': basket_stats['basket_value'].mean(),
@@ -850,6 +892,8 @@ class CrossSellAnalyzer:
                 len(basket_stats[basket_stats['unique_items'] > 1]) / len(basket_stats) * 100
             )
         }
+        
+        return self._basket_insights_cache
     
     def get_analysis_diagnostics(self) -> Dict:
         """
@@ -868,7 +912,7 @@ class CrossSellAnalyzer:
         }
         
         # Basket analysis
-        basket_sizes = self.data.groupby('order_id')['item_name'].nunique()
+        basket_sizes = self.data.groupby('order_id', observed=True)['item_name'].nunique()
         diagnostics['avg_basket_size'] = basket_sizes.mean()
         diagnostics['median_basket_size'] = basket_sizes.median()
         diagnostics['single_item_orders'] = (basket_sizes == 1).sum()
@@ -876,7 +920,7 @@ class CrossSellAnalyzer:
         diagnostics['pct_multi_item'] = (diagnostics['multi_item_orders'] / diagnostics['total_orders'] * 100)
         
         # Product frequency analysis
-        product_freq = self.data.groupby('item_name')['order_id'].nunique()
+        product_freq = self.data.groupby('item_name', observed=True)['order_id'].nunique()
         diagnostics['products_in_1_order'] = (product_freq == 1).sum()
         diagnostics['products_in_5plus_orders'] = (product_freq >= 5).sum()
         diagnostics['products_in_10plus_orders'] = (product_freq >= 10).sum()
@@ -972,11 +1016,11 @@ class CrossSellAnalyzer:
                 # Calculate average order values
                 base_orders = self.data[
                     self.data['item_name'] == base_product
-                ].groupby('order_id')['total'].sum()
+                ].groupby('order_id', observed=True)['total'].sum()
                 
                 combined_orders = self.data[
                     self.data['item_name'].isin([base_product, upsell_product])
-                ].groupby('order_id').agg({
+                ].groupby('order_id', observed=True).agg({
                     'item_name': lambda x: set(x),
                     'total': 'sum'
                 })
@@ -22,6 +22,8 @@ class CustomerAnalyzer:
         self.current_date = data['date'].max()
         # Cache for expensive computations
         self._customer_summary_cache: Optional[pd.DataFrame] = None
+        self._customer_rows_cache: Optional[Dict[str, np.ndarray]] = None
+        self._value_segments_cache: Optional[pd.DataFrame] = None
         
     def get_customer_summary(self) -> pd.DataFrame:
         """Get summary statistics for each customer with refund handling. (CACHED)"""
@@ -34,7 +36,7 @@ class CustomerAnalyzer:
         refunds_data = self.data[self.data['is_refund']]
         
         # Calculate sales metrics
-        customer_stats = sales_data.groupby('customer_name').agg({
+        customer_stats = sales_data.groupby('customer_name', observed=True).agg({
             'order_id': 'nunique',
             'total': 'sum',
             'quantity': 'sum',
@@ -49,7 +51,7 @@ class CustomerAnalyzer:
         ]
         
         # Calculate refund metrics per customer
-        customer_refunds = refunds_data.groupby('customer_name').agg({
+        customer_refunds = refunds_data.groupby('customer_name', observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'order_id': 'nunique',
             'quantity': lambda x: abs(x.sum())
@@ -78,7 +80,7 @@ class CustomerAnalyzer:
         ).dt.days + 1
         
         # Days since last purchase (use all data including refunds for recency)
-        all_dates = self.data.groupby('customer_name')['date'].max()
+        all_dates = self.data.groupby('customer_name', observed=True)['date'].max()
         customer_stats = customer_stats.set_index('customer_name').join(all_dates.rename('most_recent_activity')).reset_index()
         customer_stats['days_since_last_purchase'] = (
             self.current_date - customer_stats['most_recent_activity']
@@ -190,7 +192,7 @@ class CustomerAnalyzer:
         df = self.data.copy()
         
         # Get first purchase date for each customer
-        first_purchase = df.groupby('customer_name')['date'].min().reset_index()
+        first_purchase = df.groupby('customer_name', observed=True)['date'].min().reset_index()
         first_purchase.columns = ['customer_name', 'cohort_date']
         first_purchase['cohort_month'] = first_purchase['cohort_date'].dt.to_period('M')
         
@@ -204,7 +206,7 @@ class CustomerAnalyzer:
         )
         
         # Create cohort analysis
-        cohort_data = df.groupby(['cohort_month', 'months_since_first']).agg({
+        cohort_data = df.groupby(['cohort_month', 'months_since_first'], observed=True).agg({
             'customer_name': 'nunique',
             'total': 'sum'
         }).reset_index()
@@ -224,52 +226,52 @@ class CustomerAnalyzer:
         
         return retention_rates
     
-    def get_customer_segments_by_value(self) -> Dict:
-        """Segment customers by spending levels."""
+    def get_customer_segments_by_value(self) -> pd.DataFrame:
+        """
+        Segment customers by spending levels. (CACHED)
+        
+        Returns DataFrame with one row per segment (high_value, medium_value,
+        low_value) and columns segment, count, total_revenue, avg_spent and
+        revenue_contribution_pct.
+        """
+        # Return cached result if available
+        if self._value_segments_cache is not None:
+            return self._value_segments_cache
+        
         customer_stats = self.get_customer_summary()
+        spent = customer_stats['total_spent']
         
         # Define percentile-based segments
-        high_value_threshold = customer_stats['total_spent'].quantile(0.80)
-        medium_value_threshold = customer_stats['total_spent'].quantile(0.50)
-        
-        high_value = customer_stats[customer_stats['total_spent'] >= high_value_threshold]
-        medium_value = customer_stats[
-            (customer_stats['total_spent'] >= medium_value_threshold) & 
-            (customer_stats['total_spent'] < high_value_threshold)
-        ]
-        low_value = customer_stats[customer_stats['total_spent'] < medium_value_threshold]
+        high_value_threshold = spent.quantile(0.80)
+        medium_value_threshold = spent.quantile(0.50)
+        
+        # Label every customer in one pass; empty segments still get a row
+        segment_names = ['high_value', 'medium_value', 'low_value']
+        labels = np.select(
+            [spent >= high_value_threshold, spent >= medium_value_threshold, spent < medium_value_threshold],
+            segment_names,
+            default=None
+        )
+        segment_stats = spent.groupby(
+            pd.Categorical(labels, categories=segment_names), observed=False
+        ).agg(['count', 'sum', 'mean'])
+        
+        segments = pd.DataFrame({
+            'segment': segment_names,
+            'count': segment_stats['count'].to_numpy(),
+            'total_revenue': segment_stats['sum'].to_numpy(),
+            'avg_spent': segment_stats['mean'].to_numpy(),
+            'revenue_contribution_pct': segment_stats['sum'].to_numpy() / spent.sum() * 100
+        })
         
-        return {
-            'high_value': {
-                'count': len(high_value),
-                'total_revenue': high_value['total_spent'].sum(),
-                'avg_spent': high_value['total_spent'].mean(),
-                'revenue_contribution_pct': (
-                    high_value['total_spent'].sum() / customer_stats['total_spent'].sum() * 100
-                )
-            },
-            'medium_value': {
-                'count': len(medium_value),
-                'total_revenue': medium_value['total_spent'].sum(),
-                'avg_spent': medium_value['total_spent'].mean(),
-                'revenue_contribution_pct': (
-                    medium_value['total_spent'].sum() / customer_stats['total_spent'].sum() * 100
-                )
-            },
-            'low_value': {
-                'count': len(low_value),
-                'total_revenue': low_value['total_spent'].sum(),
-                'avg_spent': low_value['total_spent'].mean(),
-                'revenue_contribution_pct': (
-                    low_value['total_spent'].sum() / customer_stats['total_spent'].sum() * 100
-                )
-            }
-        }
+        # Cache the result
+        self._value_segments_cache = segments
+        return segments
     
     def get_customer_purchase_intervals(self) -> pd.DataFrame:
         """Calculate average time between purchases for each customer."""
         # Get orders for each customer
-        customer_orders = self.data.groupby(['customer_name', 'order_id'])['date'].min().reset_index()
+        customer_orders = self.data.groupby(['customer_name', 'order_id'], observed=True)['date'].min().reset_index()
         customer_orders = customer_orders.sort_values(['customer_name', 'date'])
         
         # Calculate intervals
@@ -295,14 +297,29 @@ class CustomerAnalyzer:
         
         return pd.DataFrame(intervals).sort_values('avg_interval_days')
     
+    def get_customer_row_positions(self) -> Dict[str, np.ndarray]:
+        """Get the row positions of each customer's transactions. (CACHED)"""
+        # Return cached result if available
+        if self._customer_rows_cache is not None:
+            return self._customer_rows_cache
+        
+        result = self.data.groupby('customer_name', observed=True, sort=False).indices
+        
+        # Cache the result
+        self._customer_rows_cache = result
+        return result
+    
     def get_customer_product_preferences(self, customer_name: str) -> pd.DataFrame:
         """Get product purchase history and preferences for a specific customer."""
-        customer_data = self.data[self.data['customer_name'] == customer_name].copy()
+        # Take the customer's rows by position instead of scanning every name
+        positions = self.get_customer_row_positions().get(customer_name)
         
-        if len(customer_data) == 0:
+        if positions is None or len(positions) == 0:
             return pd.DataFrame()
         
-        product_prefs = customer_data.groupby(['item_code', 'item_name', 'category']).agg({
+        customer_data = self.data.iloc[positions]
+        
+        product_prefs = customer_data.groupby(['item_code', 'item_name', 'category'], observed=True).agg({
             'order_id': 'nunique',
             'quantity': 'sum',
             'total': 'sum',
@@ -2,24 +2,24 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
+import io
 import sys
 import os
+import shutil
+import hashlib
+import html
+from types import MappingProxyType
 
-# Import analysis modules
+# Import analysis modules. The analyzers (and the scipy/sklearn/mlxtend stacks
+# behind them) are imported inside the functions that build them, so a session
+# only pays for the pages it actually opens.
 from data_loader import DataLoader, load_sample_data
-from sales_analysis import SalesAnalyzer
-from customer_analysis import CustomerAnalyzer
-from product_analysis import ProductAnalyzer
-from inventory_management import InventoryManager, load_inventory_from_file, create_sample_inventory
-from rfm_analysis import RFMAnalyzer
-from refill_prediction import RefillPredictor
-from cross_sell_analysis import CrossSellAnalyzer
-from ai_query import AIQueryEngine, create_query_examples
 import config
 
 # Configure pandas to display datetime with time component
@@ -31,6 +31,19 @@ pd.options.display.date_yearfirst = True
 import plotly.io as pio
 pio.templates.default = "plotly_dark"
 
+# plotly.express is imported lazily on first use so pages without charts
+# don't pay its import cost on cold start
+_PX = None
+
+
+def _px():
+    """Return the plotly.express module, importing it on first call."""
+    global _PX
+    if _PX is None:
+        import plotly.express as px
+        _PX = px
+    return _PX
+
 # Page configuration
 st.set_page_config(
     page_title="Pharmacy Sales Analytics",
@@ -46,11 +59,20 @@ if 'language' not in st.session_state:
 # Get current language
 CURRENT_LANG = st.session_state.language
 
+# Column translations for the current language, resolved once per run
+COL_TRANSLATIONS = MappingProxyType(
+    config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
+)
+
+# UI translations for the current language, resolved once per run
+TRANSLATIONS = MappingProxyType(
+    config.TRANSLATIONS.get(CURRENT_LANG, config.TRANSLATIONS['en'])
+)
+
 # Translation helper function (global)
 def t(key, **kwargs):
     """Get translation for key with optional formatting."""
-    translations = config.TRANSLATIONS.get(CURRENT_LANG, config.TRANSLATIONS['en'])
-    text = translations.get(key, key)
+    text = TRANSLATIONS.get(key, key)
     # Format with any provided kwargs (e.g., {n}, {days}, {product})
     if kwargs:
         try:
@@ -61,8 +83,7 @@ def t(key, **kwargs):
 
 def tc(column_name):
     """Translate column name based on current language."""
-    col_translations = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-    return col_translations.get(column_name, column_name)
+    return COL_TRANSLATIONS.get(column_name, column_name)
 
 def translate_columns(df, column_mapping=None):
     """
@@ -76,21 +97,49 @@ def translate_columns(df, column_mapping=None):
     Returns:
         DataFrame with translated column names
     """
-    df = df.copy()
+    # Apply custom mapping first if provided, then translate to current language.
+    # Both steps are folded into a single rename that returns a new frame sharing
+    # the column data (callers replace whole columns, never write in place).
+    column_mapping = column_mapping or {}
+    renames = {}
+    for col in df.columns:
+        std_col = column_mapping.get(col, col)
+        renames[col] = COL_TRANSLATIONS.get(std_col, std_col)
     
-    # Apply custom mapping first if provided
-    if column_mapping:
-        df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
+    return df.rename(columns=renames, copy=False)
+
+
+# Formats applied client-side by st.dataframe's NumberColumn. printf formats
+# can't group thousands, so money columns keep the browser's default grouped
+# number format (1,234,567.5) and show the currency in the column header.
+MONEY_FORMAT = 'money'
+CHANGE_PCT_FORMAT = '%+.1f%%'
+
+
+def number_column_config(formats):
+    """
+    Build an st.dataframe column_config that formats numeric columns in the browser.
     
-    # Then translate to current language
-    col_translations = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-    df = df.rename(columns={k: col_translations.get(k, k) for k in df.columns})
+    Args:
+        formats: Dict mapping standard column names to printf-style formats
+                 or MONEY_FORMAT
     
-    return df
+    Returns:
+        column_config dict keyed by the translated column names
+    """
+    column_config = {}
+    for col, fmt in formats.items():
+        name = COL_TRANSLATIONS.get(col, col)
+        if fmt == MONEY_FORMAT:
+            column_config[name] = st.column_config.NumberColumn(label=f"{name} ($)")
+        else:
+            column_config[name] = st.column_config.NumberColumn(format=fmt)
+    return column_config
 
 # Custom CSS with RTL support
+@st.cache_data(show_spinner=False)
 def get_custom_css(is_rtl=False):
-    """Generate custom CSS based on language direction."""
+    """Generate custom CSS based on language direction (cached; only two variants exist)."""
     direction = "rtl" if is_rtl else "ltr"
     text_align = "right" if is_rtl else "left"
     slider_transform = "scaleX(-1)" if is_rtl else "scaleX(1)"
@@ -119,6 +168,35 @@ def get_custom_css(is_rtl=False):
         text-align: {text_align};
     }}
     
+    /* Static metric grid (display_metrics), styled like .stMetric */
+    .metric-grid {{
+        display: flex;
+        flex-wrap: wrap;
+        gap: 1rem;
+        direction: {direction};
+        margin-bottom: 1rem;
+    }}
+    
+    .metric-card {{
+        flex: 1 1 0;
+        min-width: 10rem;
+        background-color: #f0f2f6;
+        padding: 15px;
+        border-radius: 5px;
+        direction: {direction};
+        text-align: {text_align};
+    }}
+    
+    .metric-card .metric-label {{
+        font-size: 0.875rem;
+        opacity: 0.8;
+    }}
+    
+    .metric-card .metric-value {{
+        font-size: 2.25rem;
+        line-height: 1.2;
+    }}
+    
     /* Headers */
     h1, h2, h3, h4, h5, h6 {{
         direction: {direction};
@@ -379,21 +457,282 @@ def get_custom_css(is_rtl=False):
 st.markdown(get_custom_css(is_rtl=(CURRENT_LANG == 'ar')), unsafe_allow_html=True)
 
 
+def _strftime_iso_seconds(values):
+    """
+    Format a naive datetime Series as '%Y-%m-%d %H:%M:%S' strings (NaT -> NaN).
+    
+    Uses NumPy's ISO formatting and swaps the 'T' separator for a space in the
+    fixed-width character buffer, which is several times faster than .dt.strftime.
+    """
+    seconds = values.to_numpy(dtype='datetime64[s]')
+    text = np.datetime_as_string(seconds, unit='s').astype('U19')
+    text.view(np.uint32).reshape(len(text), 19)[:, 10] = ord(' ')
+    formatted = text.astype(object)
+    formatted[np.isnat(seconds)] = np.nan
+    return pd.Series(formatted, index=values.index, name=values.name)
+
+
 def format_datetime_columns(df):
     """Format datetime columns to show both date and time."""
-    df = df.copy()
-    for col in df.columns:
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
-            # Format datetime columns to show both date and time
-            df[col] = df[col].dt.strftime(config.DATETIME_FORMAT)
-    return df
+    # Only the datetime columns are replaced, the rest are shared with df
+    formatted = {}
+    for col in df.select_dtypes(include=['datetime', 'datetimetz']).columns:
+        values = df[col]
+        if config.DATETIME_FORMAT == "%Y-%m-%d %H:%M:%S" and values.dt.tz is None:
+            formatted[col] = _strftime_iso_seconds(values)
+        else:
+            formatted[col] = values.dt.strftime(config.DATETIME_FORMAT)
+    return df.assign(**formatted) if formatted else df.copy(deep=False)
 
 
-@st.cache_data
-def load_and_process_data(file_path=None):
-    """Load and process the sales data."""
+# Distinct display tables kept translated and formatted across reruns
+DISPLAY_TABLE_CACHE_ENTRIES = 64
+
+
+@st.cache_resource(max_entries=DISPLAY_TABLE_CACHE_ENTRIES)
+def get_display_table(_df, data_id, language, table, *params):
+    """
+    Translate, datetime-format and Arrow-convert an analysis table for
+    st.dataframe (cached).
+
+    Keyed by data_id, language, a table name and the parameters that produced
+    the frame, so reruns with the same settings skip the column scan, string
+    formatting and pandas-to-Arrow conversion without hashing the frame. The
+    index is dropped (see arrow_ready). Treat the result as read-only.
+    """
+    return arrow_ready(format_datetime_columns(translate_columns(_df)))
+
+
+def extract_phone_numbers(phones):
+    """Return the non-empty, stripped phone numbers from a Series as a list."""
+    arr = np.char.strip(phones.to_numpy(dtype=str, na_value=''))
+    return arr[arr != ''].tolist()
+
+
+# Rows per chunk when writing CSV downloads
+CSV_CHUNK_ROWS = 50_000
+
+# Distinct frames whose encoded CSV stays cached
+CSV_CACHE_ENTRIES = 32
+
+
+def _write_csv_bytes(df):
+    """Encode a DataFrame as UTF-8 CSV bytes."""
+    # Write encoded rows in chunks straight into a byte buffer instead of
+    # building the whole CSV as one str and encoding a second copy of it
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8', chunksize=CSV_CHUNK_ROWS)
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=CSV_CACHE_ENTRIES)
+def get_csv_bytes(_df, data_id, table, *params):
+    """
+    Encode an analysis table as UTF-8 CSV bytes (cached).
+    
+    Keyed by data_id, a table name and the parameters that produced the frame,
+    like get_display_table, so reruns skip hashing the frame's contents.
+    """
+    return _write_csv_bytes(_df)
+
+
+def _write_parquet_bytes(df):
+    """
+    Encode a DataFrame as zstd-compressed Parquet bytes.
+    
+    Returns None if Arrow cannot represent a column (e.g. sets of items).
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression='zstd')
+    return buffer.getvalue()
+
+
+def deferred_csv_download(label, df, file_name, key, token=None):
+    """
+    Render a CSV download button that only builds the CSV once the user asks for it.
+    
+    The prepared CSV is kept in session_state under key and reused while token
+    is unchanged. The token must identify the data as well as the active filter
+    values (e.g. include get_data_id()), or a new upload reuses the old CSV.
+    """
+    prepared = st.session_state.get(key)
+    if prepared is None or prepared[0] != token:
+        if not st.button(f"📦 {t('prepare_csv')}", key=f"{key}_prepare"):
+            return
+        prepared = (token, _write_csv_bytes(df))
+        st.session_state[key] = prepared
+    
+    st.download_button(
+        label=label,
+        data=prepared[1],
+        file_name=file_name,
+        mime="text/csv",
+        key=f"{key}_button"
+    )
+
+
+def arrow_ready(df):
+    """
+    Convert a display DataFrame to a PyArrow Table so st.dataframe can send it as-is.
+    
+    The index is dropped, so only use this for tables shown with hide_index=True.
+    Frames Arrow cannot type (mixed object columns) are returned unchanged.
+    """
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df
+
+
+# Scatter traces with more points than this are rendered with WebGL
+WEBGL_POINT_THRESHOLD = 2000
+
+
+# Line charts longer than LTTB_THRESHOLD are downsampled to LTTB_POINTS points
+LTTB_THRESHOLD = 5000
+LTTB_POINTS = 2000
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Pick n_out representative point positions with Largest-Triangle-Three-Buckets.
+    
+    Keeps the first and last points and, per bucket, the point forming the
+    largest triangle with the previous pick and the next bucket's average.
+    x and y must be numeric NumPy arrays of the same length.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+    
+    return indices
+
+
+def lttb_sample(df, x, y, n_out):
+    """
+    Downsample df to n_out rows with LTTB over columns x and y.
+    
+    Datetime and numeric x columns are used as-is; any other x is treated
+    as evenly spaced.
+    """
+    if pd.api.types.is_datetime64_any_dtype(df[x]):
+        x_values = df[x].to_numpy(dtype='datetime64[ns]').view('int64').astype(float)
+    elif pd.api.types.is_numeric_dtype(df[x]):
+        x_values = df[x].to_numpy(dtype=float)
+    else:
+        x_values = np.arange(len(df), dtype=float)
+    return df.iloc[lttb_indices(x_values, df[y].to_numpy(dtype=float), n_out)]
+
+
+def top_k_rows(df, column, k):
+    """
+    Return the k rows with the largest values in column, like df.nlargest(k, column).
+    
+    Selects with np.partition (O(n)) and sorts only the winners; ties keep the
+    earlier row, as nlargest does. Frames with k or fewer non-NaN values go
+    through nlargest itself.
+    """
+    values = df[column].to_numpy(dtype=float)
+    positions = np.flatnonzero(~np.isnan(values))
+    if len(positions) <= k:
+        return df.nlargest(k, column)
+    values = values[positions]
+    
+    kth = np.partition(values, len(values) - k)[len(values) - k]
+    greater = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(greater)]
+    keep = np.concatenate([greater, ties])
+    keep = keep[np.lexsort((keep, -values[keep]))]
+    return df.iloc[positions[keep]]
+
+
+def compact_plot_values(values):
+    """
+    Return a Series as a NumPy array that serializes compactly in figure JSON.
+    
+    Whole-number floats become integers and other floats are rounded to cents,
+    so values like 20748.520000000004 are sent as 20748.52. Datetimes become
+    datetime64[ms] arrays (wall-clock time for tz-aware columns), which Plotly
+    serializes directly instead of boxing every value as a Python datetime.
+    """
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_localize(None)
+    if values.dtype.kind == 'M':
+        return values.to_numpy(dtype='datetime64[ms]')
+    array = values.to_numpy()
+    if array.dtype.kind != 'f':
+        return array
+    finite = np.isfinite(array)
+    if finite.all() and np.array_equal(array, np.round(array)):
+        return array.astype(np.int64)
+    return np.round(array, 2)
+
+
+def gradient_bar_chart(x, y, title, colorscale, x_label=None, y_label=None):
+    """
+    Build a bar chart whose bars are shaded by their value.
+    
+    A lighter replacement for px.bar(..., color=y, color_continuous_scale=...):
+    the columns go straight into a single go.Bar trace as NumPy arrays.
+    """
+    y_values = compact_plot_values(y)
+    fig = go.Figure(go.Bar(
+        x=compact_plot_values(x),
+        y=y_values,
+        marker=dict(color=y_values, colorscale=colorscale)
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label if x_label is not None else x.name,
+        yaxis_title=y_label if y_label is not None else y.name
+    )
+    return fig
+
+
+# Number of distinct data files whose loaded data and reports stay cached
+DATA_CACHE_ENTRIES = 4
+
+# Low-cardinality text columns stored as category dtype once the data is loaded
+CATEGORICAL_DATA_COLUMNS = ('customer_name', 'category', 'item_name', 'payment_method')
+
+
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES)
+def load_and_process_data(file_path=None, file_digest=None, _uploaded_file=None):
+    """
+    Load and process the sales data.
+    
+    Uploads are cached by file_digest (SHA1 of the content); the upload is only
+    written to file_path on a cache miss.
+    """
     try:
         if file_path:
+            if _uploaded_file is not None:
+                _uploaded_file.seek(0)
+                with open(file_path, "wb") as f:
+                    shutil.copyfileobj(_uploaded_file, f, length=1024 * 1024)
             loader = DataLoader(file_path)
             loader.load_data()
         else:
@@ -404,59 +743,209 @@ def load_and_process_data(file_path=None):
             loader.raw_data = sample_df
         
         processed_data = loader.preprocess_data()
-        return processed_data, loader.get_data_summary()
+        summary = loader.get_data_summary()
+        # Repeated name columns become categoricals: strings are stored once and
+        # groupbys (all observed=True) hash integer codes instead of strings
+        processed_data = processed_data.assign(**{
+            col: processed_data[col].astype('category')
+            for col in CATEGORICAL_DATA_COLUMNS
+            if col in processed_data.columns
+        })
+        return processed_data, summary
     except Exception as e:
         st.error(t('error_loading', error=str(e)))
         return None, None
 
 
-@st.cache_resource
-def get_sales_analyzer(data):
-    """Create and cache SalesAnalyzer instance."""
-    return SalesAnalyzer(data)
+def get_data_id():
+    """
+    Return the fingerprint of the loaded data (file name plus content SHA1).
+    
+    Cached factories are keyed on this instead of hashing the DataFrame on
+    every rerun.
+    """
+    return st.session_state.data_file_key
+
+
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_sales_analyzer(_data, data_id):
+    """Create and cache SalesAnalyzer instance (keyed by data_id, the data is not hashed)."""
+    from sales_analysis import SalesAnalyzer
+    return SalesAnalyzer(_data)
 
 
-@st.cache_resource
-def get_customer_analyzer(data):
-    """Create and cache CustomerAnalyzer instance."""
-    return CustomerAnalyzer(data)
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_customer_analyzer(_data, data_id):
+    """Create and cache CustomerAnalyzer instance (keyed by data_id, the data is not hashed)."""
+    from customer_analysis import CustomerAnalyzer
+    return CustomerAnalyzer(_data)
 
 
-@st.cache_resource
-def get_product_analyzer(data):
-    """Create and cache ProductAnalyzer instance."""
-    return ProductAnalyzer(data)
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_product_analyzer(_data, data_id):
+    """Create and cache ProductAnalyzer instance (keyed by data_id, the data is not hashed)."""
+    from product_analysis import ProductAnalyzer
+    return ProductAnalyzer(_data)
 
 
-@st.cache_resource
-def get_rfm_analyzer(data):
-    """Create and cache RFMAnalyzer instance."""
-    return RFMAnalyzer(data)
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_rfm_analyzer(_data, data_id):
+    """Create and cache RFMAnalyzer instance (keyed by data_id, the data is not hashed)."""
+    from rfm_analysis import RFMAnalyzer
+    return RFMAnalyzer(_data)
 
 
-@st.cache_resource
-def get_refill_predictor(data):
-    """Create and cache RefillPredictor instance."""
-    return RefillPredictor(data)
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_refill_predictor(_data, data_id):
+    """Create and cache RefillPredictor instance (keyed by data_id, the data is not hashed)."""
+    from refill_prediction import RefillPredictor
+    return RefillPredictor(_data)
 
 
-@st.cache_resource
-def get_cross_sell_analyzer(data, _enable_sampling=True, _max_records=100000):
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_cross_sell_analyzer(_data, data_id, _enable_sampling=True, _max_records=100000):
     """
     Create and cache CrossSellAnalyzer instance.
     
     Args:
-        data: Sales data
+        _data: Sales data (not hashed; the cache is keyed by data_id)
+        data_id: Fingerprint of the loaded data (see get_data_id)
         _enable_sampling: Enable sampling for large datasets (for performance)
         _max_records: Maximum records to analyze
     """
-    return CrossSellAnalyzer(data, enable_sampling=_enable_sampling, max_records=_max_records)
+    from cross_sell_analysis import CrossSellAnalyzer
+    return CrossSellAnalyzer(_data, enable_sampling=_enable_sampling, max_records=_max_records)
+
+
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_categorical_keys(_data, data_id):
+    """
+    Create and cache the order/customer/item key columns as category dtype.
+    
+    Used for page-level lookups (selectors, basket counts, filters) so they
+    work on integer codes instead of hashing strings. The name columns are
+    categorical since loading; only order_id is categorized here. Treat the
+    result as read-only.
+    """
+    return pd.DataFrame({
+        'order_id': _data['order_id'].astype('category'),
+        'customer_name': _data['customer_name'],
+        'item_name': _data['item_name'],
+    })
+
+
+@st.cache_data
+def get_sorted_names(_names, data_id, column):
+    """
+    Get the sorted unique values of a name column (as strings) for selectors.
+    
+    Cached by data_id and column name; the Series itself is not hashed.
+    """
+    # Categoricals already carry their unique values; only sort those
+    if isinstance(_names.dtype, pd.CategoricalDtype):
+        unique_names = _names.cat.categories
+    else:
+        unique_names = pd.Index(_names.dropna().unique())
+    return unique_names.astype(str).sort_values().tolist()
+
+
+@st.cache_data(show_spinner=False)
+def get_month_names(_months, data_id):
+    """
+    Map YYYY-MM month strings to their 'Month YYYY' display names.
+    
+    Cached by data_id (the month list is not hashed), so selectbox labels and
+    titles are dictionary lookups instead of a pd.to_datetime call per option.
+    """
+    names = pd.to_datetime(pd.Index(_months), format='%Y-%m').strftime('%B %Y')
+    return dict(zip(_months, names))
+
+
+@st.cache_resource(max_entries=DATA_CACHE_ENTRIES)
+def get_refund_data(_data, data_id):
+    """
+    Get the refund transactions of the loaded data.
+    
+    Cached as a resource keyed by data_id, so reruns reuse the same filtered
+    frame instead of re-masking (and copying) the full dataset. The name
+    columns keep only the categories that occur in refunds, so the product
+    selector lists refunded products only. Callers must treat the result as
+    read-only.
+    """
+    refunds = _data[_data['is_refund']]
+    return refunds.assign(**{
+        col: refunds[col].cat.remove_unused_categories()
+        for col in ('item_name', 'customer_name')
+        if col in refunds.columns
+    })
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def _cached_daily_trends(file_key, _data):
+    """Build and cache the sales summary report for the loaded file."""
+    return get_sales_analyzer(_data, file_key).get_daily_trends()
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def _cached_customer_summary(file_key, _data):
+    """Build and cache the customer analysis report for the loaded file."""
+    return get_customer_analyzer(_data, file_key).get_customer_summary()
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def _cached_product_summary(file_key, _data):
+    """Build and cache the product performance report for the loaded file."""
+    return get_product_analyzer(_data, file_key).get_product_summary()
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def _cached_rfm_segments(file_key, _data):
+    """Build and cache the RFM segmentation report for the loaded file."""
+    return get_rfm_analyzer(_data, file_key).segment_customers()
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def _cached_upcoming_refills(file_key, _data):
+    """Build and cache the refill predictions report for the loaded file."""
+    predictor = get_refill_predictor(_data, file_key)
+    predictor.calculate_purchase_intervals()
+    return predictor.get_upcoming_refills(30)
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def _cached_product_affinity(file_key, _data):
+    """Build and cache the cross-sell opportunities report for the loaded file."""
+    return get_cross_sell_analyzer(_data, file_key).analyze_product_affinity()
+
+
+# Export report builders keyed by their (untranslated) report label key.
+# The cached builders are keyed on the loaded file's content key.
+EXPORT_REPORTS = MappingProxyType({
+    'sales_summary': _cached_daily_trends,
+    'customer_analysis': _cached_customer_summary,
+    'product_performance_report': _cached_product_summary,
+    'rfm_segmentation_report': _cached_rfm_segments,
+    'refill_predictions_report': _cached_upcoming_refills,
+    'cross_sell_opportunities': _cached_product_affinity,
+})
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def get_report_downloads(_report_df, data_id, report_key):
+    """
+    Encode an export report as CSV and Parquet bytes (cached).
+    
+    Keyed by data_id and the report key, so Generate clicks on an unchanged
+    file skip hashing the report. The Parquet bytes are None if Arrow cannot
+    represent a column.
+    """
+    return _write_csv_bytes(_report_df), _write_parquet_bytes(_report_df)
 
 
 def get_ai_query_engine(data):
     """Create and cache AIQueryEngine instance in session state."""
-    # Use a hash of the data shape to detect data changes
-    data_hash = f"{len(data)}_{data.columns.tolist()}"
+    # Use the loaded data's fingerprint to detect data changes
+    data_hash = get_data_id()
     
     # Initialize or retrieve from session state
     if 'ai_query_engine' not in st.session_state:
@@ -466,6 +955,7 @@ def get_ai_query_engine(data):
     # Create new engine if data has changed or engine doesn't exist
     if (st.session_state.ai_query_engine is None or 
         st.session_state.ai_query_engine_data_hash != data_hash):
+        from ai_query import AIQueryEngine
         st.session_state.ai_query_engine = AIQueryEngine(data)
         st.session_state.ai_query_engine_data_hash = data_hash
     
@@ -473,43 +963,40 @@ def get_ai_query_engine(data):
 
 
 def display_metrics(metrics):
-    """Display key metrics in columns."""
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            t('total_revenue'),
-            f"${metrics.get('total_revenue', 0):,.2f}",
-            help=t('help_total_revenue')
-        )
-    
-    with col2:
-        st.metric(
-            t('total_orders'),
-            f"{metrics.get('unique_orders', 0):,}",
-            help=t('help_unique_orders')
-        )
-    
-    with col3:
-        st.metric(
-            t('unique_customers'),
-            f"{metrics.get('unique_customers', 0):,}",
-            help=t('help_unique_customers')
-        )
-    
-    with col4:
-        st.metric(
-            t('avg_order_value'),
-            f"${metrics.get('avg_order_value', 0):,.2f}",
-            help=t('help_avg_order')
-        )
+    """Display key metrics as a single static HTML grid (one element instead of four widgets)."""
+    cards = [
+        (t('total_revenue'), f"${metrics.get('total_revenue', 0):,.2f}", t('help_total_revenue')),
+        (t('total_orders'), f"{metrics.get('unique_orders', 0):,}", t('help_unique_orders')),
+        (t('unique_customers'), f"{metrics.get('unique_customers', 0):,}", t('help_unique_customers')),
+        (t('avg_order_value'), f"${metrics.get('avg_order_value', 0):,.2f}", t('help_avg_order')),
+    ]
+    cards_html = "".join(
+        f'<div class="metric-card" title="{html.escape(help_text)}">'
+        f'<div class="metric-label">{html.escape(label)}</div>'
+        f'<div class="metric-value">{html.escape(value)}</div>'
+        f'</div>'
+        for label, value, help_text in cards
+    )
+    st.markdown(f'<div class="metric-grid">{cards_html}</div>', unsafe_allow_html=True)
+
+
+# Trend charts with more periods than this are downsampled to TREND_LTTB_POINTS
+TREND_LTTB_THRESHOLD = 2000
+TREND_LTTB_POINTS = 1000
+
+# Trend period key -> (SalesAnalyzer method, x-axis column)
+TREND_PERIODS = MappingProxyType({
+    'daily': ('get_daily_trends', 'date'),
+    'weekly': ('get_weekly_trends', 'week_start'),
+    'monthly': ('get_monthly_trends', 'month_start'),
+})
 
 
 def sales_analysis_page(data):
     """Sales analysis section."""
     st.header(f"📊 {t('sales_analysis')}")
     
-    analyzer = get_sales_analyzer(data)
+    analyzer = get_sales_analyzer(data, get_data_id())
     
     # Overall metrics (always show all-time data)
     st.subheader(t('overall_performance'))
@@ -525,35 +1012,41 @@ def sales_analysis_page(data):
         st.subheader(t('revenue_trends'))
         
         # Time period selection
-        period = st.selectbox(t('select_period'), [t('daily'), t('weekly'), t('monthly')], key='sales_trends_period')
-        
-        if period == t('daily'):
-            trends = analyzer.get_daily_trends()
-            x_col = 'date'
-        elif period == t('weekly'):
-            trends = analyzer.get_weekly_trends()
-            x_col = 'week_start'
-        else:
-            trends = analyzer.get_monthly_trends()
-            x_col = 'month_start'
+        period_key = st.selectbox(
+            t('select_period'), list(TREND_PERIODS), format_func=t, key='sales_trends_period'
+        )
+        period = t(period_key)
+        
+        trends_method, x_col = TREND_PERIODS[period_key]
+        trends = getattr(analyzer, trends_method)()
+        
+        # Long multi-year daily trends are downsampled (LTTB on revenue) unless
+        # the user asks for every point
+        if len(trends) > TREND_LTTB_THRESHOLD:
+            total_points = len(trends)
+            if not st.toggle(t('full_resolution'), key='sales_trends_full_resolution'):
+                trends = lttb_sample(trends, x_col, 'revenue', TREND_LTTB_POINTS)
+                st.caption(t(
+                    'showing_representative_points',
+                    shown=f"{len(trends):,}", total=f"{total_points:,}", period=period.lower()
+                ))
         
         # Revenue trend chart
         fig = go.Figure()
         fig.add_trace(go.Bar(
-            x=trends[x_col], y=trends['revenue'],
+            x=compact_plot_values(trends[x_col]), y=compact_plot_values(trends['revenue']),
             name='Revenue',
             marker=dict(color='#1f77b4')
         ))
         
         if 'revenue_ma7' in trends.columns:
             fig.add_trace(go.Scatter(
-                x=trends[x_col], y=trends['revenue_ma7'],
+                x=compact_plot_values(trends[x_col]), y=compact_plot_values(trends['revenue_ma7']),
                 mode='lines',
                 name='7-Day MA',
                 line=dict(color='#ff7f0e', width=3, dash='dash')
             ))
         
-        period_key = 'daily' if period == t('daily') else ('weekly' if period == t('weekly') else 'monthly')
         fig.update_layout(
             title=f"{period} {t('revenue')} {t('trend')}",
             xaxis_title=t('date'),
@@ -566,20 +1059,18 @@ def sales_analysis_page(data):
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_orders = px.bar(
-                trends, x=x_col, y='orders',
+            fig_orders = gradient_bar_chart(
+                trends[x_col], trends['orders'],
                 title=f"{period} Orders",
-                color='orders',
-                color_continuous_scale='Blues'
+                colorscale='Blues'
             )
             st.plotly_chart(fig_orders, width='stretch')
         
         with col2:
-            fig_customers = px.bar(
-                trends, x=x_col, y='customers',
+            fig_customers = gradient_bar_chart(
+                trends[x_col], trends['customers'],
                 title=f"{period} Unique Customers",
-                color='customers',
-                color_continuous_scale='Greens'
+                colorscale='Greens'
             )
             st.plotly_chart(fig_customers, width='stretch')
     
@@ -589,10 +1080,11 @@ def sales_analysis_page(data):
         # Month filter selector (inside Top Products tab only)
         # Get available months
         available_months = analyzer.get_available_months()
+        month_names = get_month_names(available_months, get_data_id())
         
         # Create month options: "All Time" + individual months
         month_options = ["All Time"] + [
-            f"{month} ({pd.to_datetime(month).strftime('%B %Y')})"
+            f"{month} ({month_names[month]})"
             for month in available_months
         ]
         
@@ -616,7 +1108,7 @@ def sales_analysis_page(data):
         else:
             # Extract YYYY-MM from "YYYY-MM (Month YYYY)" format
             selected_month = selected_option.split(" ")[0]
-            period_label = pd.to_datetime(selected_month).strftime('%B %Y')
+            period_label = month_names[selected_month]
             period_count = ""
         
         with filter_col2:
@@ -664,14 +1156,8 @@ def sales_analysis_page(data):
         # Data table section
         st.markdown(f"### 📋 Detailed Product Data")
         
-        # Data table with renamed columns
-        top_products_display = top_products.copy()
-        
-        # Format currency columns before translation
-        if 'revenue' in top_products_display.columns:
-            top_products_display['revenue'] = top_products_display['revenue'].apply(lambda x: f"${x:,.2f}")
-        if 'price_per_unit' in top_products_display.columns:
-            top_products_display['price_per_unit'] = top_products_display['price_per_unit'].apply(lambda x: f"${x:,.2f}")
+        # Currency columns stay numeric (sortable) and are formatted by the browser
+        top_products_display = top_products
         
         # Add special marker to quantity column
         if 'quantity' in top_products_display.columns:
@@ -684,7 +1170,8 @@ def sales_analysis_page(data):
             format_datetime_columns(top_products_display),
             use_container_width=True,
             hide_index=True,
-            height=400
+            height=400,
+            column_config=number_column_config({'revenue': MONEY_FORMAT, 'price_per_unit': MONEY_FORMAT})
         )
         st.caption("⭐ Quantity is the total sold (Units and Pieces are informational)")
         
@@ -698,14 +1185,13 @@ def sales_analysis_page(data):
         else:
             chart_title += " - All Time"
         
-        fig = px.bar(
-            top_products,
-            x='item_name',
-            y=chart_metric if chart_metric in top_products.columns else 'revenue',
+        y_col = chart_metric if chart_metric in top_products.columns else 'revenue'
+        fig = gradient_bar_chart(
+            top_products['item_name'], top_products[y_col],
             title=chart_title,
-            color=chart_metric if chart_metric in top_products.columns else 'revenue',
-            color_continuous_scale='Blues',
-            labels={'item_name': 'Product', chart_metric: chart_metric_label}
+            colorscale='Blues',
+            x_label='Product',
+            y_label=chart_metric_label if y_col == chart_metric else None
         )
         fig.update_xaxes(tickangle=-45)
         fig.update_layout(showlegend=False, height=500)
@@ -719,27 +1205,22 @@ def sales_analysis_page(data):
         with col1:
             # Day of week patterns
             dow_patterns = analyzer.get_day_of_week_patterns()
-            fig_dow = px.bar(
-                dow_patterns,
-                x='day',
-                y='revenue',
+            fig_dow = gradient_bar_chart(
+                dow_patterns['day'], dow_patterns['revenue'],
                 title='Revenue by Day of Week',
-                color='revenue',
-                color_continuous_scale='Greens'
+                colorscale='Greens'
             )
             st.plotly_chart(fig_dow, width='stretch')
         
         with col2:
             # Hourly patterns
             hourly_patterns = analyzer.get_hourly_patterns()
-            fig_hourly = px.bar(
-                hourly_patterns,
-                x='hour',
-                y='revenue',
+            fig_hourly = gradient_bar_chart(
+                hourly_patterns['hour'], hourly_patterns['revenue'],
                 title='Revenue by Hour of Day',
-                color='revenue',
-                color_continuous_scale='Blues',
-                labels={'hour': 'Hour of Day', 'revenue': 'Revenue ($)'}
+                colorscale='Blues',
+                x_label='Hour of Day',
+                y_label='Revenue ($)'
             )
             # Ensure x-axis shows all hours
             fig_hourly.update_xaxes(
@@ -764,11 +1245,12 @@ def sales_analysis_page(data):
         # Plot with anomalies highlighted
         fig = go.Figure()
         
-        # Normal days
+        # Normal days (drawn with WebGL once there are too many for SVG markers)
         normal_days = anomalies[~anomalies['is_anomaly']]
-        fig.add_trace(go.Scatter(
-            x=normal_days['date'],
-            y=normal_days['total'],
+        normal_trace = go.Scattergl if len(normal_days) > WEBGL_POINT_THRESHOLD else go.Scatter
+        fig.add_trace(normal_trace(
+            x=compact_plot_values(normal_days['date']),
+            y=compact_plot_values(normal_days['total']),
             mode='markers',
             name='Normal Days',
             marker=dict(color='blue', size=6)
@@ -777,8 +1259,8 @@ def sales_analysis_page(data):
         # Anomalous days
         anomaly_days = anomalies[anomalies['is_anomaly']]
         fig.add_trace(go.Scatter(
-            x=anomaly_days['date'],
-            y=anomaly_days['total'],
+            x=compact_plot_values(anomaly_days['date']),
+            y=compact_plot_values(anomaly_days['total']),
             mode='markers',
             name='Anomalies',
             marker=dict(color='red', size=10, symbol='star')
@@ -808,7 +1290,7 @@ def sales_analysis_page(data):
                 'date', 'total', 'num_orders', 'quantity',
                 'revenue_diff_pct', 'orders_diff_pct', 'quantity_diff_pct',
                 'anomaly_reason', 'anomaly_score'
-            ]].sort_values('date', ascending=False).copy()
+            ]].sort_values('date', ascending=False)
             
             # Rename columns to match translation keys
             anomaly_display = anomaly_display.rename(columns={
@@ -826,45 +1308,69 @@ def sales_analysis_page(data):
             st.dataframe(
                 format_datetime_columns(anomaly_display),
                 use_container_width=True,
-                hide_index=True
+                hide_index=True,
+                column_config=number_column_config({
+                    'revenue': MONEY_FORMAT,
+                    'revenue_change_pct': CHANGE_PCT_FORMAT,
+                    'orders_change_pct': CHANGE_PCT_FORMAT,
+                    'quantity_change_pct': CHANGE_PCT_FORMAT,
+                    'anomaly_score': '%.3f'
+                })
             )
             
-            # Add detailed view with expandable sections
+            # Z-scores for every anomalous day in one table, flagged when |z| > 2
             st.markdown(f"### 🔍 {t('detailed_anomaly_breakdown')}")
-            for idx, row in anomaly_days.sort_values('date', ascending=False).iterrows():
-                with st.expander(f"📅 {row['date'].strftime('%Y-%m-%d (%A)')} - {row['anomaly_reason']}"):
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.metric("Revenue", 
-                                 f"${row['total']:,.2f}",
-                                 delta=f"{row['revenue_diff_pct']:+.1f}%",
-                                 delta_color="off")
-                        st.caption(f"Normal avg: ${row['avg_revenue']:,.0f}")
-                    
-                    with col2:
-                        st.metric("Orders", 
-                                 f"{int(row['num_orders'])}",
-                                 delta=f"{row['orders_diff_pct']:+.1f}%",
-                                 delta_color="off")
-                        st.caption(f"Normal avg: {row['avg_orders']:.0f}")
-                    
-                    with col3:
-                        st.metric("Quantity Sold", 
-                                 f"{int(row['quantity'])}",
-                                 delta=f"{row['quantity_diff_pct']:+.1f}%",
-                                 delta_color="off")
-                        st.caption(f"Normal avg: {row['avg_quantity']:.0f}")
-                    
-                    # Show z-scores
-                    st.markdown("**Statistical Scores:**")
-                    st.write(f"- Revenue Z-Score: {row['revenue_zscore']:.2f} "
-                            f"({'⚠️ Significant' if abs(row['revenue_zscore']) > 2 else '✓ Normal'})")
-                    st.write(f"- Orders Z-Score: {row['orders_zscore']:.2f} "
-                            f"({'⚠️ Significant' if abs(row['orders_zscore']) > 2 else '✓ Normal'})")
-                    st.write(f"- Quantity Z-Score: {row['quantity_zscore']:.2f} "
-                            f"({'⚠️ Significant' if abs(row['quantity_zscore']) > 2 else '✓ Normal'})")
-                    st.write(f"- Anomaly Score: {row['anomaly_score']:.3f} (more negative = more anomalous)")
+            anomaly_days = anomaly_days.sort_values('date', ascending=False)
+            # Significance flags are computed column-wise rather than per row
+            zscore_table = anomaly_days[['date', 'anomaly_reason']]
+            for metric in ('revenue', 'orders', 'quantity'):
+                zscores = anomaly_days[f'{metric}_zscore']
+                zscore_table = zscore_table.assign(**{
+                    f'{metric}_zscore': zscores,
+                    f'{metric}_signal': np.where(zscores.abs().to_numpy() > 2, '⚠️ Significant', '✓ Normal'),
+                })
+            zscore_table = translate_columns(zscore_table.assign(anomaly_score=anomaly_days['anomaly_score']))
+            zscore_style = format_datetime_columns(zscore_table).style.format({
+                COL_TRANSLATIONS.get('revenue_zscore', 'revenue_zscore'): '{:.2f}',
+                COL_TRANSLATIONS.get('orders_zscore', 'orders_zscore'): '{:.2f}',
+                COL_TRANSLATIONS.get('quantity_zscore', 'quantity_zscore'): '{:.2f}',
+                COL_TRANSLATIONS.get('anomaly_score', 'anomaly_score'): '{:.3f}',
+            })
+            st.dataframe(zscore_style, use_container_width=True, hide_index=True)
+            
+            # Full breakdown for a single selected day (labels formatted in one pass)
+            day_labels = anomaly_days['date'].dt.strftime('%Y-%m-%d (%A)').to_numpy()
+            selected_day = st.selectbox(
+                t('select_anomaly_day'),
+                range(len(anomaly_days)),
+                format_func=day_labels.__getitem__,
+                key='sales_anomaly_day'
+            )
+            row = anomaly_days.iloc[selected_day]
+            st.markdown(f"**📅 {day_labels[selected_day]} - {row['anomaly_reason']}**")
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Revenue", 
+                         f"${row['total']:,.2f}",
+                         delta=f"{row['revenue_diff_pct']:+.1f}%",
+                         delta_color="off")
+                st.caption(f"Normal avg: ${row['avg_revenue']:,.0f}")
+            
+            with col2:
+                st.metric("Orders", 
+                         f"{int(row['num_orders'])}",
+                         delta=f"{row['orders_diff_pct']:+.1f}%",
+                         delta_color="off")
+                st.caption(f"Normal avg: {row['avg_orders']:.0f}")
+            
+            with col3:
+                st.metric("Quantity Sold", 
+                         f"{int(row['quantity'])}",
+                         delta=f"{row['quantity_diff_pct']:+.1f}%",
+                         delta_color="off")
+                st.caption(f"Normal avg: {row['avg_quantity']:.0f}")
+            st.caption(f"Anomaly Score: {row['anomaly_score']:.3f} (more negative = more anomalous)")
         else:
             st.info(t('no_anomalies_detected'))
     
@@ -901,30 +1407,6 @@ def sales_analysis_page(data):
                     f"${refund_analysis['avg_refund_value']:,.2f}"
                 )
             
-            # Controls for refunded products and customers (outside tabs to prevent reset)
-            st.markdown(f"### 🎛️ {t('display_controls')}")
-            col_ctrl1, col_ctrl2 = st.columns(2)
-            with col_ctrl1:
-                n_refunded = st.slider(
-                    "📦 Number of Refunded Products",
-                    min_value=5,
-                    max_value=100,
-                    value=10,
-                    step=5,
-                    help="Adjust how many refunded products to display",
-                    key="refund_products_slider"
-                )
-            with col_ctrl2:
-                n_refund_customers = st.slider(
-                    "👤 Number of Refund Customers",
-                    min_value=5,
-                    max_value=100,
-                    value=10,
-                    step=5,
-                    help="Adjust how many refund customers to display",
-                    key="refund_customers_slider_new"
-                )
-            
             st.markdown("---")
             
             # Tabs within refunds
@@ -936,64 +1418,10 @@ def sales_analysis_page(data):
             ])
             
             with refund_tab1:
-                st.subheader(t('top_refunded_products'))
-                
-                top_refunded = refund_analysis['top_refunded_products']
-                
-                if len(top_refunded) > 0:
-                    # Bar chart
-                    fig = px.bar(
-                        top_refunded.head(n_refunded),
-                        x='item_name',
-                        y='refund_amount',
-                        title=f"{t('products_by_refund_amount')} - Top {n_refunded}",
-                        color='refund_amount',
-                        color_continuous_scale='Reds',
-                        labels={'refund_amount': t('refund_amount'), 'item_name': t('product')}
-                    )
-                    fig.update_xaxes(tickangle=-45)
-                    st.plotly_chart(fig, width='stretch')
-                    
-                    # Detailed table - shows same number as slider
-                    refund_products_display = top_refunded.head(n_refunded).copy()
-                    refund_products_display = translate_columns(refund_products_display)
-                    st.dataframe(
-                        refund_products_display,
-                        use_container_width=True,
-                        hide_index=True
-                    )
-                else:
-                    st.info(t('no_data_available'))
+                refund_products_tab(refund_analysis)
             
             with refund_tab2:
-                st.subheader(t('customers_with_most_refunds'))
-                
-                top_refund_customers = refund_analysis['top_refund_customers']
-                
-                if len(top_refund_customers) > 0:
-                    # Bar chart
-                    fig = px.bar(
-                        top_refund_customers.head(n_refund_customers),
-                        x='customer_name',
-                        y='refund_amount',
-                        title=f"{t('customers_by_refund_amount')} - Top {n_refund_customers}",
-                        color='refund_amount',
-                        color_continuous_scale='Oranges',
-                        labels={'refund_amount': t('refund_amount'), 'customer_name': t('customer')}
-                    )
-                    fig.update_xaxes(tickangle=-45)
-                    st.plotly_chart(fig, width='stretch')
-                    
-                    # Detailed table - shows same number as slider
-                    refund_customers_display = top_refund_customers.head(n_refund_customers).copy()
-                    refund_customers_display = translate_columns(refund_customers_display)
-                    st.dataframe(
-                        refund_customers_display,
-                        use_container_width=True,
-                        hide_index=True
-                    )
-                else:
-                    st.info(t('no_data_available'))
+                refund_customers_tab(refund_analysis)
             
             with refund_tab3:
                 st.subheader(t('refund_trends_over_time'))
@@ -1002,18 +1430,16 @@ def sales_analysis_page(data):
                 refunds_by_month = refund_analysis['refunds_by_month']
                 
                 if len(refunds_by_month) > 0:
-                    # Convert period to string for plotting
-                    refunds_by_month['month_str'] = refunds_by_month['month'].astype(str)
+                    # 'YYYY-MM' labels are precomputed by the analyzer
+                    month_str = refunds_by_month['month_str']
                     
                     # Bar chart
-                    fig = px.bar(
-                        refunds_by_month,
-                        x='month_str',
-                        y='refund_amount',
+                    fig = gradient_bar_chart(
+                        month_str, refunds_by_month['refund_amount'],
                         title=t('monthly_refund_trend'),
-                        labels={'refund_amount': t('refund_amount'), 'month_str': t('month')},
-                        color='refund_amount',
-                        color_continuous_scale='Reds'
+                        colorscale='Reds',
+                        x_label=t('month'),
+                        y_label=t('refund_amount')
                     )
                     fig.update_layout(
                         xaxis_title=t('month'),
@@ -1023,120 +1449,281 @@ def sales_analysis_page(data):
                     st.plotly_chart(fig, width='stretch')
                     
                     # Orders trend
-                    fig2 = px.bar(
-                        refunds_by_month,
-                        x='month_str',
-                        y='refund_orders',
+                    fig2 = gradient_bar_chart(
+                        month_str, refunds_by_month['refund_orders'],
                         title=t('monthly_refund_orders'),
-                        labels={'refund_orders': t('refund_orders'), 'month_str': t('month')},
-                        color='refund_orders',
-                        color_continuous_scale='Reds'
+                        colorscale='Reds',
+                        x_label=t('month'),
+                        y_label=t('refund_orders')
                     )
                     st.plotly_chart(fig2, width='stretch')
                 else:
                     st.info(t('no_data_available'))
             
             with refund_tab4:
-                st.subheader(t('refund_transaction_details'))
-                
-                # Get actual refund transactions from data
-                refund_data = data[data['is_refund']]
-                
-                if len(refund_data) > 0:
-                    # Add filter options
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Date filter
-                        date_range = st.date_input(
-                            t('date_range'),
-                            value=(refund_data['date'].min().date(), refund_data['date'].max().date()),
-                            key='refund_date_range'
-                        )
-                    
-                    with col2:
-                        # Product filter
-                        all_products = [t('all_products')] + sorted(refund_data['item_name'].unique().tolist())
-                        selected_product = st.selectbox(
-                            t('filter_by_product'),
-                            all_products,
-                            key='refund_details_product_filter'
-                        )
-                    
-                    # Apply filters
-                    filtered_refunds = refund_data.copy()
-                    
-                    if len(date_range) == 2:
-                        filtered_refunds = filtered_refunds[
-                            (filtered_refunds['date'].dt.date >= date_range[0]) &
-                            (filtered_refunds['date'].dt.date <= date_range[1])
-                        ]
-                    
-                    if selected_product != t('all_products'):
-                        filtered_refunds = filtered_refunds[filtered_refunds['item_name'] == selected_product]
-                    
-                    # Display summary
-                    st.metric(
-                        t('filtered_refunds'),
-                        f"{len(filtered_refunds):,}",
-                        f"${abs(filtered_refunds['total'].sum()):,.2f}"
-                    )
-                    
-                    # Display refund transactions
-                    display_columns = ['date', 'order_id', 'customer_name', 'item_name', 
-                                      'units', 'pieces', 'quantity', 'total']
-                    # Only include columns that exist
-                    display_columns = [col for col in display_columns if col in filtered_refunds.columns]
-                    refund_display = filtered_refunds[display_columns].copy()
-                    
-                    # Convert to positive values for readability
-                    if 'total' in refund_display.columns:
-                        refund_display['total'] = refund_display['total'].abs()
-                    if 'quantity' in refund_display.columns:
-                        refund_display['quantity'] = refund_display['quantity'].abs()
-                    if 'units' in refund_display.columns:
-                        refund_display['units'] = refund_display['units'].abs()
-                    if 'pieces' in refund_display.columns:
-                        refund_display['pieces'] = refund_display['pieces'].abs()
-                    
-                    refund_display = refund_display.sort_values('date', ascending=False)
-                    
-                    # Rename 'total' to 'refund_amount' and add marker to quantity
-                    if 'total' in refund_display.columns:
-                        refund_display = refund_display.rename(columns={'total': 'refund_amount'})
-                    if 'quantity' in refund_display.columns:
-                        refund_display = refund_display.rename(columns={'quantity': 'quantity ⭐'})
-                    
-                    # Translate column names
-                    refund_display = translate_columns(refund_display)
-                    
-                    st.dataframe(
-                        format_datetime_columns(refund_display),
-                        use_container_width=True,
-                        hide_index=True
-                    )
-                    st.caption("⭐ Quantity = total units refunded (Units and Pieces show breakdown if available)")
-                    
-                    # Download button
-                    csv = refund_display.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label=t('download_refund_data'),
-                        data=csv,
-                        file_name=f"refunds_{date_range[0]}_{date_range[1]}.csv",
-                        mime="text/csv"
-                    )
-                else:
-                    st.info(t('no_refund_transactions'))
+                refund_details_tab(data, get_data_id())
+
+
+@st.fragment
+def refund_products_tab(refund_analysis):
+    """Refunded products tab; a fragment so its slider reruns only this tab."""
+    st.subheader(t('top_refunded_products'))
+    
+    n_refunded = st.slider(
+        "📦 Number of Refunded Products",
+        min_value=5,
+        max_value=100,
+        value=10,
+        step=5,
+        help="Adjust how many refunded products to display",
+        key="refund_products_slider"
+    )
+    
+    top_refunded = refund_analysis['top_refunded_products']
+    
+    if len(top_refunded) > 0:
+        # Bar chart
+        top_refunded_shown = top_refunded.head(n_refunded)
+        fig = gradient_bar_chart(
+            top_refunded_shown['item_name'], top_refunded_shown['refund_amount'],
+            title=f"{t('products_by_refund_amount')} - Top {n_refunded}",
+            colorscale='Reds',
+            x_label=t('product'),
+            y_label=t('refund_amount')
+        )
+        fig.update_xaxes(tickangle=-45)
+        st.plotly_chart(fig, width='stretch')
+        
+        # Detailed table - shows same number as slider
+        st.dataframe(
+            translate_columns(top_refunded_shown),
+            use_container_width=True,
+            hide_index=True,
+            column_config=number_column_config({'refund_amount': MONEY_FORMAT})
+        )
+    else:
+        st.info(t('no_data_available'))
+
+
+@st.fragment
+def refund_customers_tab(refund_analysis):
+    """Refund customers tab; a fragment so its slider reruns only this tab."""
+    st.subheader(t('customers_with_most_refunds'))
+    
+    n_refund_customers = st.slider(
+        "👤 Number of Refund Customers",
+        min_value=5,
+        max_value=100,
+        value=10,
+        step=5,
+        help="Adjust how many refund customers to display",
+        key="refund_customers_slider_new"
+    )
+    
+    top_refund_customers = refund_analysis['top_refund_customers']
+    
+    if len(top_refund_customers) > 0:
+        # Bar chart
+        top_refund_customers_shown = top_refund_customers.head(n_refund_customers)
+        fig = gradient_bar_chart(
+            top_refund_customers_shown['customer_name'], top_refund_customers_shown['refund_amount'],
+            title=f"{t('customers_by_refund_amount')} - Top {n_refund_customers}",
+            colorscale='Oranges',
+            x_label=t('customer'),
+            y_label=t('refund_amount')
+        )
+        fig.update_xaxes(tickangle=-45)
+        st.plotly_chart(fig, width='stretch')
+        
+        # Detailed table - shows same number as slider
+        st.dataframe(
+            translate_columns(top_refund_customers_shown),
+            use_container_width=True,
+            hide_index=True,
+            column_config=number_column_config({'refund_amount': MONEY_FORMAT})
+        )
+    else:
+        st.info(t('no_data_available'))
+
+
+# Default number of refund transactions rendered in the details table
+REFUND_DETAIL_ROWS = 500
+
+
+@st.fragment
+def refund_details_tab(data, data_id):
+    """Refund transaction details tab; a fragment so its filters rerun only this tab."""
+    st.subheader(t('refund_transaction_details'))
+    
+    # Get actual refund transactions from data
+    refund_data = get_refund_data(data, data_id)
+    
+    if len(refund_data) > 0:
+        # Add filter options
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Date filter
+            date_range = st.date_input(
+                t('date_range'),
+                value=(refund_data['date'].min().date(), refund_data['date'].max().date()),
+                key='refund_date_range'
+            )
+        
+        with col2:
+            # Product filter
+            all_products = [t('all_products')] + get_sorted_names(
+                refund_data['item_name'], get_data_id(), 'refund_item_name'
+            )
+            selected_product = st.selectbox(
+                t('filter_by_product'),
+                all_products,
+                key='refund_details_product_filter'
+            )
+        
+        # Apply filters
+        # Each filter builds a new frame, so the cached refunds are never modified
+        filtered_refunds = refund_data
+        
+        if len(date_range) == 2:
+            # Compare datetime64 values against the range bounds directly
+            # (the end date is inclusive, so stop before the next midnight)
+            refund_dates = filtered_refunds['date']
+            range_start = pd.Timestamp(date_range[0], tz=refund_dates.dt.tz)
+            range_end = pd.Timestamp(date_range[1], tz=refund_dates.dt.tz) + pd.Timedelta(days=1)
+            filtered_refunds = filtered_refunds[
+                (refund_dates >= range_start) & (refund_dates < range_end)
+            ]
+        
+        if selected_product != t('all_products'):
+            filtered_refunds = filtered_refunds[filtered_refunds['item_name'] == selected_product]
+        
+        # Display summary
+        st.metric(
+            t('filtered_refunds'),
+            f"{len(filtered_refunds):,}",
+            f"${abs(filtered_refunds['total'].sum()):,.2f}"
+        )
+        
+        # Display refund transactions
+        display_columns = ['date', 'order_id', 'customer_name', 'item_name', 
+                          'units', 'pieces', 'quantity', 'total']
+        # Only include columns that exist
+        display_columns = [col for col in display_columns if col in filtered_refunds.columns]
+        # Convert to positive values for readability
+        refund_display = filtered_refunds[display_columns].assign(**{
+            col: filtered_refunds[col].abs()
+            for col in ('total', 'quantity', 'units', 'pieces')
+            if col in display_columns
+        }).sort_values('date', ascending=False)
+        
+        # Rename 'total' to 'refund_amount' and add marker to quantity
+        if 'total' in refund_display.columns:
+            refund_display = refund_display.rename(columns={'total': 'refund_amount'})
+        if 'quantity' in refund_display.columns:
+            refund_display = refund_display.rename(columns={'quantity': 'quantity ⭐'})
+        
+        # Translate column names
+        refund_display = translate_columns(refund_display)
+        
+        # Only the newest rows are sent to the browser; the download has them all
+        n_rows = st.number_input(
+            t('rows_to_show'),
+            min_value=100,
+            max_value=10000,
+            value=REFUND_DETAIL_ROWS,
+            step=100,
+            key='refund_details_rows'
+        )
+        st.dataframe(
+            format_datetime_columns(refund_display.head(n_rows)),
+            use_container_width=True,
+            hide_index=True,
+            column_config=number_column_config({'refund_amount': MONEY_FORMAT})
+        )
+        st.caption(t(
+            'showing_refund_rows',
+            shown=f"{min(n_rows, len(refund_display)):,}", total=f"{len(refund_display):,}"
+        ))
+        st.caption("⭐ Quantity = total units refunded (Units and Pieces show breakdown if available)")
+        
+        # Download button (the CSV is only built on request, for the current filters)
+        deferred_csv_download(
+            t('download_refund_data'),
+            refund_display,
+            file_name=f"refunds_{date_range[0]}_{date_range[-1]}.csv",
+            key='refund_details_csv',
+            token=(data_id, tuple(date_range), selected_product)
+        )
+    else:
+        st.info(t('no_refund_transactions'))
+
+
+# Stacked bars only get in-bar text labels up to this many segments
+STACKED_LABEL_LIMIT = 200
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_ENTRIES)
+def _cached_category_trend_chart(file_key, _data):
+    """Build and cache the stacked monthly category spending chart for the loaded file."""
+    monthly_category = get_sales_analyzer(_data, file_key).get_monthly_category_breakdown()
+    
+    # Create pivot table for stacked bar chart
+    pivot_data = monthly_category.pivot_table(
+        index='year_month',
+        columns='category',
+        values='revenue',
+        aggfunc='sum',
+        fill_value=0,
+        observed=True
+    )
+    
+    # Month labels and per-bar text are formatted once, column by column
+    month_labels = pd.to_datetime(pivot_data.index, format='%Y-%m').strftime('%b %Y').to_numpy()
+    
+    # Past STACKED_LABEL_LIMIT segments the text nodes swamp the browser's SVG
+    # rendering and are unreadable anyway; values stay in the unified hover
+    show_labels = pivot_data.size <= STACKED_LABEL_LIMIT
+    
+    fig_stacked = go.Figure()
+    
+    for category in pivot_data.columns:
+        revenue = pivot_data[category]
+        text_kw = {}
+        if show_labels:
+            text_kw = dict(
+                text=np.where(revenue.to_numpy() > 0, revenue.map('${:,.0f}'.format).to_numpy(), ''),
+                textposition='inside'
+            )
+        fig_stacked.add_trace(go.Bar(
+            x=month_labels,
+            y=compact_plot_values(revenue),
+            name=category,
+            **text_kw
+        ))
+    
+    fig_stacked.update_layout(
+        title='Monthly Category Spending Trend',
+        xaxis_title='Month',
+        yaxis_title='Revenue ($)',
+        barmode='stack',
+        height=500,
+        hovermode='x unified'
+    )
+    return fig_stacked
 
 
 def monthly_analysis_page(data):
     """Monthly sales and category analysis with comparison."""
+    px = _px()
     st.header(f"📅 {t('monthly_sales_category')}")
     
-    analyzer = get_sales_analyzer(data)
+    data_id = get_data_id()
+    analyzer = get_sales_analyzer(data, data_id)
     
     # Get available months
     available_months = analyzer.get_available_months()
+    month_names = get_month_names(available_months, data_id)
     
     if len(available_months) == 0:
         st.warning(t('no_data_monthly'))
@@ -1173,17 +1760,16 @@ def monthly_analysis_page(data):
             display_monthly = translate_columns(display_monthly)
             
             # Get translated column names for formatting
-            trans_cols = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-            gross_col = trans_cols.get('gross_revenue', 'Gross Revenue')
-            refund_col = trans_cols.get('refund_amount', 'Refunds')
-            net_col = trans_cols.get('net_revenue', 'Net Revenue')
-            rate_col = trans_cols.get('refund_rate', 'Refund Rate %')
-            orders_col = trans_cols.get('orders', 'Orders')
-            refund_orders_col = trans_cols.get('refund_orders', 'Refund Orders')
-            customers_col = trans_cols.get('customers', 'Customers')
-            items_sold_col = trans_cols.get('items_sold', 'Items Sold')
-            items_refunded_col = trans_cols.get('items_refunded', 'Items Refunded')
-            mom_col = trans_cols.get('mom_growth', 'MoM Growth %')
+            gross_col = COL_TRANSLATIONS.get('gross_revenue', 'Gross Revenue')
+            refund_col = COL_TRANSLATIONS.get('refund_amount', 'Refunds')
+            net_col = COL_TRANSLATIONS.get('net_revenue', 'Net Revenue')
+            rate_col = COL_TRANSLATIONS.get('refund_rate', 'Refund Rate %')
+            orders_col = COL_TRANSLATIONS.get('orders', 'Orders')
+            refund_orders_col = COL_TRANSLATIONS.get('refund_orders', 'Refund Orders')
+            customers_col = COL_TRANSLATIONS.get('customers', 'Customers')
+            items_sold_col = COL_TRANSLATIONS.get('items_sold', 'Items Sold')
+            items_refunded_col = COL_TRANSLATIONS.get('items_refunded', 'Items Refunded')
+            mom_col = COL_TRANSLATIONS.get('mom_growth', 'MoM Growth %')
             
             st.dataframe(
                 display_monthly.style.format({
@@ -1213,7 +1799,7 @@ def monthly_analysis_page(data):
                 y=monthly_trends['revenue'],
                 name='Revenue',
                 marker=dict(color='#1f77b4'),
-                text=monthly_trends['revenue'].apply(lambda x: f'${x:,.0f}'),
+                text=monthly_trends['revenue'].map('${:,.0f}'.format),
                 textposition='auto'
             ))
             
@@ -1243,14 +1829,14 @@ def monthly_analysis_page(data):
                 "Select Month for Detailed Category Breakdown",
                 options=month_options,
                 index=0,  # Default to "All Time"
-                format_func=lambda x: x if x == "All Time" else pd.to_datetime(x).strftime('%B %Y'),
+                format_func=lambda x: month_names.get(x, x),
                 key='monthly_category_selector'
             )
             
             # Filter for selected month or aggregate all
             if selected_option == "All Time":
                 # Aggregate all months
-                month_data = monthly_category.groupby('category').agg({
+                month_data = monthly_category.groupby('category', observed=True).agg({
                     'revenue': 'sum',
                     'quantity': 'sum',
                     'orders': 'sum',
@@ -1264,18 +1850,19 @@ def monthly_analysis_page(data):
             else:
                 # Filter for selected month
                 month_data = monthly_category[monthly_category['year_month'] == selected_option]
-                period_label = pd.to_datetime(selected_option).strftime('%B %Y')
+                period_label = month_names[selected_option]
             
             if len(month_data) > 0:
-                # Category summary metrics
+                # Category summary metrics, summed in one pass and reused below
+                totals = month_data[['revenue', 'refund_amount', 'net_revenue']].sum()
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Gross Revenue", f"${month_data['revenue'].sum():,.2f}")
+                    st.metric("Gross Revenue", f"${totals['revenue']:,.2f}")
                 with col2:
-                    st.metric("Total Refunds", f"${month_data['refund_amount'].sum():,.2f}", 
-                             delta=f"-{month_data['refund_amount'].sum() / month_data['revenue'].sum() * 100:.1f}%")
+                    st.metric("Total Refunds", f"${totals['refund_amount']:,.2f}", 
+                             delta=f"-{totals['refund_amount'] / totals['revenue'] * 100:.1f}%")
                 with col3:
-                    st.metric("Net Revenue", f"${month_data['net_revenue'].sum():,.2f}")
+                    st.metric("Net Revenue", f"${totals['net_revenue']:,.2f}")
                 with col4:
                     st.metric("Total Categories", len(month_data))
                 
@@ -1284,7 +1871,7 @@ def monthly_analysis_page(data):
                 display_categories = month_data[['category', 'revenue', 'refund_amount', 'net_revenue', 
                                                   'refund_rate', 'quantity', 'refund_quantity', 
                                                   'orders', 'avg_order_value']].copy()
-                display_categories['revenue_pct'] = (display_categories['revenue'] / display_categories['revenue'].sum() * 100).round(2)
+                display_categories['revenue_pct'] = (display_categories['revenue'] * (100.0 / totals['revenue'])).round(2)
                 display_categories = display_categories.sort_values('revenue', ascending=False)
                 
                 # Rename columns to match translation keys
@@ -1298,17 +1885,16 @@ def monthly_analysis_page(data):
                 display_categories = translate_columns(display_categories)
                 
                 # Get translated column names for formatting
-                trans_cols = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-                cat_col = trans_cols.get('category', 'Category')
-                gross_col = trans_cols.get('gross_revenue', 'Gross Revenue')
-                refund_col = trans_cols.get('refund_amount', 'Refunds')
-                net_col = trans_cols.get('net_revenue', 'Net Revenue')
-                rate_col = trans_cols.get('refund_rate', 'Refund Rate %')
-                qty_col = trans_cols.get('quantity', 'Quantity')
-                qty_refund_col = trans_cols.get('refund_quantity', 'Qty Refunded')
-                orders_col = trans_cols.get('orders', 'Orders')
-                aov_col = trans_cols.get('avg_order_value', 'Avg Order Value')
-                rev_pct_col = trans_cols.get('revenue_pct', 'Revenue %')
+                cat_col = COL_TRANSLATIONS.get('category', 'Category')
+                gross_col = COL_TRANSLATIONS.get('gross_revenue', 'Gross Revenue')
+                refund_col = COL_TRANSLATIONS.get('refund_amount', 'Refunds')
+                net_col = COL_TRANSLATIONS.get('net_revenue', 'Net Revenue')
+                rate_col = COL_TRANSLATIONS.get('refund_rate', 'Refund Rate %')
+                qty_col = COL_TRANSLATIONS.get('quantity', 'Quantity')
+                qty_refund_col = COL_TRANSLATIONS.get('refund_quantity', 'Qty Refunded')
+                orders_col = COL_TRANSLATIONS.get('orders', 'Orders')
+                aov_col = COL_TRANSLATIONS.get('avg_order_value', 'Avg Order Value')
+                rev_pct_col = COL_TRANSLATIONS.get('revenue_pct', 'Revenue %')
                 
                 st.dataframe(
                     display_categories.style.format({
@@ -1341,39 +1927,12 @@ def monthly_analysis_page(data):
             # Stacked bar chart for all months
             st.markdown("#### Category Spending Trend Across All Months")
             
-            # Create pivot table for stacked bar chart
-            pivot_data = monthly_category.pivot_table(
-                index='year_month',
-                columns='category',
-                values='revenue',
-                aggfunc='sum',
-                fill_value=0
-            )
-            
-            fig_stacked = go.Figure()
-            
-            for category in pivot_data.columns:
-                fig_stacked.add_trace(go.Bar(
-                    x=[pd.to_datetime(m).strftime('%b %Y') for m in pivot_data.index],
-                    y=pivot_data[category],
-                    name=category,
-                    text=pivot_data[category].apply(lambda x: f'${x:,.0f}' if x > 0 else ''),
-                    textposition='inside'
-                ))
-            
-            fig_stacked.update_layout(
-                title='Monthly Category Spending Trend',
-                xaxis_title='Month',
-                yaxis_title='Revenue ($)',
-                barmode='stack',
-                height=500,
-                hovermode='x unified'
-            )
-            
+            # Stacked bar chart (pivot and labels are cached per data file)
+            fig_stacked = _cached_category_trend_chart(data_id, data)
             st.plotly_chart(fig_stacked, width='stretch')
             
             # Download option
-            csv_data = monthly_category.to_csv(index=False)
+            csv_data = get_csv_bytes(monthly_category, data_id, 'monthly_category')
             st.download_button(
                 label="📥 Download Monthly Category Data (CSV)",
                 data=csv_data,
@@ -1397,7 +1956,7 @@ def monthly_analysis_page(data):
                     "First Month",
                     options=available_months,
                     index=max(0, len(available_months) - 2),
-                    format_func=lambda x: pd.to_datetime(x).strftime('%B %Y'),
+                    format_func=month_names.__getitem__,
                     key='month1'
                 )
             
@@ -1406,7 +1965,7 @@ def monthly_analysis_page(data):
                     "Second Month",
                     options=available_months,
                     index=len(available_months) - 1,
-                    format_func=lambda x: pd.to_datetime(x).strftime('%B %Y'),
+                    format_func=month_names.__getitem__,
                     key='month2'
                 )
             
@@ -1417,8 +1976,8 @@ def monthly_analysis_page(data):
                 if 'error' in comparison:
                     st.error(comparison['error'])
                 else:
-                    month1_name = pd.to_datetime(month1).strftime('%B %Y')
-                    month2_name = pd.to_datetime(month2).strftime('%B %Y')
+                    month1_name = month_names[month1]
+                    month2_name = month_names[month2]
                     
                     # Overall metrics comparison
                     st.markdown(f"### Overall Comparison: {month1_name} vs {month2_name}")
@@ -1483,13 +2042,12 @@ def monthly_analysis_page(data):
                         ]].copy()
                         
                         # Use translated terms for column headers
-                        trans_cols = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-                        cat_label = trans_cols.get('category', 'Category')
-                        rev_label = trans_cols.get('revenue', 'Revenue')
-                        qty_label = trans_cols.get('quantity', 'Qty')
-                        orders_label = trans_cols.get('orders', 'Orders')
-                        change_label = trans_cols.get('change', 'Change')
-                        change_pct_label = trans_cols.get('change_pct', 'Change %')
+                        cat_label = COL_TRANSLATIONS.get('category', 'Category')
+                        rev_label = COL_TRANSLATIONS.get('revenue', 'Revenue')
+                        qty_label = COL_TRANSLATIONS.get('quantity', 'Qty')
+                        orders_label = COL_TRANSLATIONS.get('orders', 'Orders')
+                        change_label = COL_TRANSLATIONS.get('change', 'Change')
+                        change_pct_label = COL_TRANSLATIONS.get('change_pct', 'Change %')
                         
                         display_comp.columns = [
                             cat_label,
@@ -1503,6 +2061,13 @@ def monthly_analysis_page(data):
                             f'{month2_name} {orders_label}'
                         ]
                         
+                        # Green for growth, red for decline: one vectorized pass over the
+                        # numeric change column instead of a Python call per cell
+                        change_pct = category_comp['revenue_change_pct'].to_numpy(dtype=float)
+                        change_colors = np.where(
+                            change_pct >= 0, 'color: green', np.where(change_pct < 0, 'color: red', '')
+                        )
+                        
                         st.dataframe(
                             display_comp.style.format({
                                 f'{month1_name} {rev_label}': '${:,.2f}',
@@ -1513,9 +2078,8 @@ def monthly_analysis_page(data):
                                 f'{month2_name} {qty_label}': '{:,.0f}',
                                 f'{month1_name} {orders_label}': '{:,.0f}',
                                 f'{month2_name} {orders_label}': '{:,.0f}'
-                            }).map(
-                                lambda x: 'color: green' if isinstance(x, str) and '+' in str(x) and '%' in str(x) else 
-                                         ('color: red' if isinstance(x, str) and '-' in str(x) and '%' in str(x) else ''),
+                            }).apply(
+                                lambda col: change_colors,
                                 subset=[change_pct_label]
                             ),
                             use_container_width=True,
@@ -1530,7 +2094,7 @@ def monthly_analysis_page(data):
                             y=category_comp['revenue_m1'],
                             name=month1_name,
                             marker=dict(color='#1f77b4'),
-                            text=category_comp['revenue_m1'].apply(lambda x: f'${x:,.0f}'),
+                            text=category_comp['revenue_m1'].map('${:,.0f}'.format),
                             textposition='auto'
                         ))
                         
@@ -1539,7 +2103,7 @@ def monthly_analysis_page(data):
                             y=category_comp['revenue_m2'],
                             name=month2_name,
                             marker=dict(color='#ff7f0e'),
-                            text=category_comp['revenue_m2'].apply(lambda x: f'${x:,.0f}'),
+                            text=category_comp['revenue_m2'].map('${:,.0f}'.format),
                             textposition='auto'
                         ))
                         
@@ -1555,7 +2119,7 @@ def monthly_analysis_page(data):
                         st.plotly_chart(fig_compare, width='stretch')
                         
                         # Download comparison
-                        csv_comparison = category_comp.to_csv(index=False)
+                        csv_comparison = get_csv_bytes(category_comp, data_id, 'category_comparison', month1, month2)
                         st.download_button(
                             label=f"📥 Download Comparison ({month1_name} vs {month2_name})",
                             data=csv_comparison,
@@ -1568,9 +2132,11 @@ def monthly_analysis_page(data):
 
 def customer_analysis_page(data):
     """Customer behavior analysis section."""
+    px = _px()
     st.header(f"👥 {t('customer_insights')}")
     
-    analyzer = get_customer_analyzer(data)
+    data_id = get_data_id()
+    analyzer = get_customer_analyzer(data, data_id)
     
     # Customer metrics
     st.subheader(t('customer_metrics'))
@@ -1625,22 +2191,22 @@ def customer_analysis_page(data):
         with col1:
             st.write(f"**High-Value Customers (by Spend) - Top {n_high_value}**")
             high_value = analyzer.get_high_value_customers(n_high_value)
-            high_value_display = translate_columns(high_value.copy())
-            st.dataframe(format_datetime_columns(high_value_display), use_container_width=True, hide_index=True)
+            high_value_display = get_display_table(high_value, data_id, CURRENT_LANG, 'high_value', n_high_value)
+            st.dataframe(high_value_display, use_container_width=True, hide_index=True)
         
         with col2:
             st.write(f"**Frequent Buyers - Top {n_frequent}**")
             frequent = analyzer.get_frequent_buyers(n_frequent)
-            frequent_display = translate_columns(frequent.copy())
-            st.dataframe(format_datetime_columns(frequent_display), use_container_width=True, hide_index=True)
+            frequent_display = get_display_table(frequent, data_id, CURRENT_LANG, 'frequent', n_frequent)
+            st.dataframe(frequent_display, use_container_width=True, hide_index=True)
         
         # Add customer product history section
         st.markdown("---")
         st.markdown(f"### 🛒 {t('customer_purchase_history')}")
         st.markdown("Select a customer to view all products they have purchased")
         
-        # Get list of all customers
-        customers = sorted([str(c) for c in data['customer_name'].unique()])
+        # Get list of all customers (sorted once per data file)
+        customers = get_sorted_names(get_categorical_keys(data, data_id)['customer_name'], data_id, 'customer_name')
         
         col_select, col_button = st.columns([4, 1])
         with col_select:
@@ -1677,9 +2243,11 @@ def customer_analysis_page(data):
                     
                     # Display product history table
                     st.markdown(f"#### Products purchased by **{selected_customer}**")
-                    product_history_display = translate_columns(product_history.copy())
+                    product_history_display = get_display_table(
+                        product_history, data_id, CURRENT_LANG, 'product_history', selected_customer
+                    )
                     st.dataframe(
-                        format_datetime_columns(product_history_display),
+                        product_history_display,
                         use_container_width=True,
                         hide_index=True
                     )
@@ -1690,9 +2258,9 @@ def customer_analysis_page(data):
                     
                     with col_viz1:
                         # Top products by spend
-                        top_products_spend = product_history.nlargest(10, 'total_spent')
+                        top_products_spend = top_k_rows(product_history, 'total_spent', 10)
                         fig_spend = px.bar(
-                            top_products_spend,
+                            top_products_spend[['item_name', 'total_spent']],
                             x='item_name',
                             y='total_spent',
                             title=f'Top 10 Products by Spend - {selected_customer}',
@@ -1705,9 +2273,9 @@ def customer_analysis_page(data):
                     
                     with col_viz2:
                         # Top products by purchase frequency
-                        top_products_freq = product_history.nlargest(10, 'times_purchased')
+                        top_products_freq = top_k_rows(product_history, 'times_purchased', 10)
                         fig_freq = px.bar(
-                            top_products_freq,
+                            top_products_freq[['item_name', 'times_purchased']],
                             x='item_name',
                             y='times_purchased',
                             title=f'Top 10 Products by Purchase Frequency - {selected_customer}',
@@ -1722,7 +2290,7 @@ def customer_analysis_page(data):
                     if 'category' in product_history.columns:
                         st.markdown("---")
                         st.markdown("#### Category Breakdown")
-                        category_summary = product_history.groupby('category').agg({
+                        category_summary = product_history.groupby('category', observed=True).agg({
                             'total_spent': 'sum',
                             'total_quantity': 'sum',
                             'times_purchased': 'sum',
@@ -1759,7 +2327,7 @@ def customer_analysis_page(data):
                     
                     # Download option
                     st.markdown("---")
-                    csv = product_history.to_csv(index=False)
+                    csv = get_csv_bytes(product_history, data_id, 'product_history', selected_customer)
                     st.download_button(
                         label=f"📥 Download {selected_customer}'s Purchase History",
                         data=csv,
@@ -1778,9 +2346,9 @@ def customer_analysis_page(data):
         if len(churn_risk) > 0:
             st.warning(f"Found {len(churn_risk)} customers at risk of churning")
             
-            # Visualization
+            # Visualization of the top 50 spenders (only the plotted columns are passed to Plotly)
             fig = px.scatter(
-                churn_risk.head(50),
+                churn_risk.head(50)[['customer_name', 'days_since_last_purchase', 'total_spent', 'total_orders']],
                 x='days_since_last_purchase',
                 y='total_spent',
                 size='total_orders',
@@ -1793,8 +2361,8 @@ def customer_analysis_page(data):
             )
             st.plotly_chart(fig, width='stretch')
             
-            churn_risk_display = translate_columns(churn_risk.copy())
-            st.dataframe(format_datetime_columns(churn_risk_display), use_container_width=True, hide_index=True)
+            churn_risk_display = get_display_table(churn_risk, data_id, CURRENT_LANG, 'churn_risk', threshold)
+            st.dataframe(churn_risk_display, use_container_width=True, hide_index=True)
         else:
             st.success("No customers at risk of churning!")
     
@@ -1804,17 +2372,13 @@ def customer_analysis_page(data):
         segments = analyzer.get_customer_segments_by_value()
         
         # Create segment comparison
-        segment_data = []
-        for segment_name, segment_info in segments.items():
-            segment_data.append({
-                'Segment': segment_name.replace('_', ' ').title(),
-                'Customers': segment_info['count'],
-                'Revenue': segment_info['total_revenue'],
-                'Avg Spend': segment_info['avg_spent'],
-                'Revenue %': segment_info['revenue_contribution_pct']
-            })
-        
-        segment_df = pd.DataFrame(segment_data)
+        segment_df = pd.DataFrame({
+            'Segment': segments['segment'].str.replace('_', ' ').str.title(),
+            'Customers': segments['count'],
+            'Revenue': segments['total_revenue'],
+            'Avg Spend': segments['avg_spent'],
+            'Revenue %': segments['revenue_contribution_pct']
+        })
         
         # Translate segment dataframe columns
         segment_df_translated = segment_df.copy()
@@ -1825,7 +2389,7 @@ def customer_analysis_page(data):
         
         with col1:
             fig_count = px.pie(
-                segment_df,
+                segment_df[['Segment', 'Customers']],
                 values='Customers',
                 names='Segment',
                 title='Customer Distribution by Segment'
@@ -1835,7 +2399,7 @@ def customer_analysis_page(data):
         
         with col2:
             fig_revenue = px.pie(
-                segment_df,
+                segment_df[['Segment', 'Revenue']],
                 values='Revenue',
                 names='Segment',
                 title='Revenue Contribution by Segment'
@@ -1843,7 +2407,11 @@ def customer_analysis_page(data):
             fig_revenue.update_layout(height=600)
             st.plotly_chart(fig_revenue, width='stretch')
         
-        st.dataframe(format_datetime_columns(segment_df_translated), use_container_width=True, hide_index=True)
+        st.dataframe(
+            get_display_table(segment_df_translated, data_id, CURRENT_LANG, 'segments'),
+            use_container_width=True,
+            hide_index=True
+        )
     
     with tab4:
         st.subheader(t('new_customers'))
@@ -1855,7 +2423,7 @@ def customer_analysis_page(data):
             st.info(f"{len(new_customers)} new customers in the last {days_back} days")
             
             # Daily new customer acquisition
-            daily_new = new_customers.groupby('first_purchase').size().reset_index()
+            daily_new = new_customers.groupby('first_purchase', observed=True).size().reset_index()
             daily_new.columns = ['date', 'new_customers']
             
             fig = px.bar(
@@ -1867,17 +2435,18 @@ def customer_analysis_page(data):
             st.plotly_chart(fig, width='stretch')
             
             # Translate columns in dataframe
-            new_customers_display = translate_columns(new_customers.copy())
-            st.dataframe(format_datetime_columns(new_customers_display), use_container_width=True, hide_index=True)
+            new_customers_display = get_display_table(new_customers, data_id, CURRENT_LANG, 'new_customers', days_back)
+            st.dataframe(new_customers_display, use_container_width=True, hide_index=True)
         else:
             st.info(f"No new customers in the last {days_back} days")
 
 
 def product_analysis_page(data):
     """Product performance analysis section."""
+    px = _px()
     st.header(f"📦 {t('product_performance')}")
     
-    analyzer = get_product_analyzer(data)
+    analyzer = get_product_analyzer(data, get_data_id())
     
     # Display overall product metrics including refunds
     st.subheader(f"📊 {t('product_overview')}")
@@ -1948,7 +2517,7 @@ def product_analysis_page(data):
                 
                 fast_movers_display = translate_columns(fast_movers_display)
                 
-                st.dataframe(format_datetime_columns(fast_movers_display), use_container_width=True, hide_index=True)
+                st.dataframe(arrow_ready(format_datetime_columns(fast_movers_display)), use_container_width=True, hide_index=True)
                 st.caption("⭐ Quantity Sold = total units sold (Units and Pieces are breakdowns)")
                 
                 # Quick stats with refund info
@@ -1983,7 +2552,7 @@ def product_analysis_page(data):
                 
                 slow_movers_display = translate_columns(slow_movers_display)
                 
-                st.dataframe(format_datetime_columns(slow_movers_display), use_container_width=True, hide_index=True)
+                st.dataframe(arrow_ready(format_datetime_columns(slow_movers_display)), use_container_width=True, hide_index=True)
                 st.caption("⭐ Quantity Sold = total units sold (Units and Pieces are breakdowns)")
                 
                 # Quick stats with refund info
@@ -2042,7 +2611,7 @@ def product_analysis_page(data):
         abc_data = analyzer.classify_products_abc()
         
         # Distribution
-        abc_summary = abc_data.groupby('abc_class').agg({
+        abc_summary = abc_data.groupby('abc_class', observed=True).agg({
             'item_name': 'count',
             'revenue': 'sum',
             'quantity_sold': 'sum',
@@ -2072,7 +2641,7 @@ def product_analysis_page(data):
         with col2:
             # Translate for display in table
             abc_summary_display = translate_columns(abc_summary)
-            st.dataframe(format_datetime_columns(abc_summary_display), use_container_width=True, hide_index=True)
+            st.dataframe(arrow_ready(format_datetime_columns(abc_summary_display)), use_container_width=True, hide_index=True)
         
         # Full table
         class_filter = st.multiselect(
@@ -2089,7 +2658,7 @@ def product_analysis_page(data):
         
         filtered_abc = translate_columns(filtered_abc)
         
-        st.dataframe(format_datetime_columns(filtered_abc), use_container_width=True, hide_index=True)
+        st.dataframe(arrow_ready(format_datetime_columns(filtered_abc)), use_container_width=True, hide_index=True)
         st.caption("⭐ Quantity Sold = total units sold (ABC classification based on revenue)")
     
     with tab3:
@@ -2112,7 +2681,7 @@ def product_analysis_page(data):
             st.plotly_chart(fig, width='stretch')
         
         with col2:
-            stage_revenue = lifecycle.groupby('lifecycle_stage')['revenue'].sum()
+            stage_revenue = lifecycle.groupby('lifecycle_stage', observed=True)['revenue'].sum()
             fig = px.bar(
                 x=stage_revenue.index,
                 y=stage_revenue.values,
@@ -2128,12 +2697,115 @@ def product_analysis_page(data):
         
         lifecycle_display = translate_columns(lifecycle_display)
         
-        st.dataframe(format_datetime_columns(lifecycle_display), use_container_width=True, hide_index=True)
+        st.dataframe(arrow_ready(format_datetime_columns(lifecycle_display)), use_container_width=True, hide_index=True)
         st.caption("⭐ Quantity Sold = total units sold (lifecycle stage based on sales trends)")
 
 
+@st.fragment
+def inventory_reorder_tab(manager, lead_time, urgency_threshold):
+    """Reorder alerts tab; a fragment so the signal filter reruns only this tab."""
+    px = _px()
+    st.subheader(f"⚠️ {t('reorder_recommendations')}")
+    
+    # Get reorder signals
+    reorder_df = manager.get_reorder_signals(
+        lead_time_days=lead_time,
+        urgency_threshold_days=urgency_threshold
+    )
+    
+    # Filter options
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        signal_filter = st.selectbox(
+            t('filter_by_signal'),
+            ['All', 'OUT_OF_STOCK', 'URGENT_REORDER', 'REORDER_SOON', 'MONITOR', 'OK'],
+            key='inventory_signal_filter'
+        )
+    
+    if signal_filter != 'All':
+        filtered_df = reorder_df[reorder_df['reorder_signal'] == signal_filter].copy()
+    else:
+        filtered_df = reorder_df.copy()
+    
+    # Signal distribution chart
+    col1, col2 = st.columns(2)
+    with col1:
+        signal_counts = reorder_df['reorder_signal'].value_counts()
+        fig = px.pie(
+            values=signal_counts.values,
+            names=signal_counts.index,
+            title="Reorder Signal Distribution",
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        fig.update_layout(height=600)
+        st.plotly_chart(fig, width='stretch')
+    
+    with col2:
+        # Top items needing reorder
+        urgent_items = reorder_df[
+            reorder_df['reorder_signal'].isin(['OUT_OF_STOCK', 'URGENT_REORDER'])
+        ].iloc[:10]
+        
+        if len(urgent_items) > 0:
+            fig = px.bar(
+                urgent_items,
+                x='quantity_to_order',
+                y='item_name',
+                title="Top 10 Items to Reorder (by Quantity)",
+                labels={'quantity_to_order': 'Quantity to Order', 'item_name': 'Product'},
+                orientation='h',
+                color='reorder_signal',
+                color_discrete_map={
+                    'OUT_OF_STOCK': '#dc3545',
+                    'URGENT_REORDER': '#fd7e14'
+                }
+            )
+            fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+            st.plotly_chart(fig, width='stretch')
+    
+    # Display table
+    st.markdown(f"### 📋 {t('reorder_recommendations')} ({len(filtered_df)} items)")
+    
+    # Build display columns - include Units, Pieces, and Quantity
+    display_cols = ['item_code', 'item_name', 'category', 'units', 'pieces', 'quantity', 
+                   'reorder_signal', 'reorder_point', 'days_of_stock', 'daily_sales_velocity', 
+                   'quantity_to_order', 'priority_score']
+    
+    # Select only columns that exist in the data
+    display_df = filtered_df[
+        [col for col in display_cols if col in filtered_df.columns]
+    ].copy()
+    
+    # Add marker to quantity column and translate
+    if 'quantity' in display_df.columns:
+        display_df = display_df.rename(columns={'quantity': 'quantity ⭐'})
+    
+    # Translate all column names
+    display_df = translate_columns(display_df)
+    
+    st.dataframe(
+        arrow_ready(display_df),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    # Add explanation
+    st.info("⭐ **Quantity** is the authoritative stock level used for all calculations. Units & Pieces are informational.")
+    
+    # Download button
+    deferred_csv_download(
+        label=f"📥 {t('download_reorder_list')}",
+        df=filtered_df,
+        file_name=f"reorder_list_{datetime.now().strftime('%Y%m%d')}.csv",
+        key='download_reorder_list',
+        token=(get_data_id(), st.session_state.inventory_data_key, signal_filter, lead_time, urgency_threshold)
+    )
+
+
 def inventory_management_page(data):
     """Inventory management and reorder signals section."""
+    from inventory_management import InventoryManager, create_sample_inventory
+    px = _px()
     st.header(f"📦 {t('inventory_title')}")
     st.markdown(t('inventory_description'))
     st.markdown("---")
@@ -2143,6 +2815,8 @@ def inventory_management_page(data):
         st.session_state.inventory_data = None
     if 'inventory_manager' not in st.session_state:
         st.session_state.inventory_manager = None
+    if 'inventory_data_key' not in st.session_state:
+        st.session_state.inventory_data_key = None
     
     # File upload section
     col1, col2 = st.columns([3, 1])
@@ -2161,21 +2835,26 @@ def inventory_management_page(data):
         if st.button(f"🎲 {t('use_sample_inventory')}", type="secondary"):
             with st.spinner("Generating sample inventory..."):
                 st.session_state.inventory_data = create_sample_inventory(data)
+                st.session_state.inventory_data_key = f"sample:{get_data_id()}"
                 st.success("✓ Sample inventory loaded!")
     
-    # Load inventory data
+    # Load inventory data (only parsed again when the uploaded content changes)
     if uploaded_file is not None:
-        try:
-            with st.spinner("Loading inventory file..."):
-                if uploaded_file.name.endswith('.csv'):
-                    inventory_df = pd.read_csv(uploaded_file)
-                else:
-                    inventory_df = pd.read_excel(uploaded_file)
-                st.session_state.inventory_data = inventory_df
-                st.success(f"✓ Loaded {len(inventory_df)} items from {uploaded_file.name}")
-        except Exception as e:
-            st.error(f"Error loading file: {str(e)}")
-            return
+        file_digest = hashlib.sha1(uploaded_file.getbuffer()).hexdigest()
+        inventory_data_key = f"{uploaded_file.name}:{file_digest}"
+        if st.session_state.inventory_data_key != inventory_data_key:
+            try:
+                with st.spinner("Loading inventory file..."):
+                    if uploaded_file.name.endswith('.csv'):
+                        inventory_df = pd.read_csv(uploaded_file)
+                    else:
+                        inventory_df = pd.read_excel(uploaded_file)
+                    st.session_state.inventory_data = inventory_df
+                    st.session_state.inventory_data_key = inventory_data_key
+            except Exception as e:
+                st.error(f"Error loading file: {str(e)}")
+                return
+        st.success(f"✓ Loaded {len(st.session_state.inventory_data)} items from {uploaded_file.name}")
     
     # If no inventory data, show message and return
     if st.session_state.inventory_data is None:
@@ -2197,13 +2876,19 @@ def inventory_management_page(data):
             st.caption("Example: ITEM001 has 1 unit + 1 piece = Quantity 1.50 | ITEM002 has 0 units + 1 piece = Quantity 0.50")
         return
     
-    # Create inventory manager
-    try:
-        manager = InventoryManager(st.session_state.inventory_data, data)
-        st.session_state.inventory_manager = manager
-    except Exception as e:
-        st.error(f"Error analyzing inventory: {str(e)}")
-        return
+    # Create inventory manager, reusing the previous one (and its cached
+    # analyses) while the inventory and sales data are unchanged
+    manager_key = (get_data_id(), st.session_state.inventory_data_key)
+    if (st.session_state.inventory_manager is None or
+            st.session_state.get('inventory_manager_key') != manager_key):
+        try:
+            manager = InventoryManager(st.session_state.inventory_data, data)
+            st.session_state.inventory_manager = manager
+            st.session_state.inventory_manager_key = manager_key
+        except Exception as e:
+            st.error(f"Error analyzing inventory: {str(e)}")
+            return
+    manager = st.session_state.inventory_manager
     
     # Settings in sidebar
     st.sidebar.markdown("---")
@@ -2259,7 +2944,7 @@ def inventory_management_page(data):
         if len(category_df) > 0:
             # Category table FIRST
             category_df_display = translate_columns(category_df.copy())
-            st.dataframe(category_df_display, use_container_width=True, hide_index=True)
+            st.dataframe(arrow_ready(category_df_display), use_container_width=True, hide_index=True)
             
             st.markdown("---")
             
@@ -2295,101 +2980,7 @@ def inventory_management_page(data):
             st.info("Category information not available in inventory data")
     
     with tab2:
-        st.subheader(f"⚠️ {t('reorder_recommendations')}")
-        
-        # Get reorder signals
-        reorder_df = manager.get_reorder_signals(
-            lead_time_days=lead_time,
-            urgency_threshold_days=urgency_threshold
-        )
-        
-        # Filter options
-        col1, col2 = st.columns([2, 3])
-        with col1:
-            signal_filter = st.selectbox(
-                t('filter_by_signal'),
-                ['All', 'OUT_OF_STOCK', 'URGENT_REORDER', 'REORDER_SOON', 'MONITOR', 'OK'],
-                key='inventory_signal_filter'
-            )
-        
-        if signal_filter != 'All':
-            filtered_df = reorder_df[reorder_df['reorder_signal'] == signal_filter].copy()
-        else:
-            filtered_df = reorder_df.copy()
-        
-        # Signal distribution chart
-        col1, col2 = st.columns(2)
-        with col1:
-            signal_counts = reorder_df['reorder_signal'].value_counts()
-            fig = px.pie(
-                values=signal_counts.values,
-                names=signal_counts.index,
-                title="Reorder Signal Distribution",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig.update_layout(height=600)
-            st.plotly_chart(fig, width='stretch')
-        
-        with col2:
-            # Top items needing reorder
-            urgent_items = reorder_df[
-                reorder_df['reorder_signal'].isin(['OUT_OF_STOCK', 'URGENT_REORDER'])
-            ].head(10)
-            
-            if len(urgent_items) > 0:
-                fig = px.bar(
-                    urgent_items,
-                    x='quantity_to_order',
-                    y='item_name',
-                    title="Top 10 Items to Reorder (by Quantity)",
-                    labels={'quantity_to_order': 'Quantity to Order', 'item_name': 'Product'},
-                    orientation='h',
-                    color='reorder_signal',
-                    color_discrete_map={
-                        'OUT_OF_STOCK': '#dc3545',
-                        'URGENT_REORDER': '#fd7e14'
-                    }
-                )
-                fig.update_layout(yaxis={'categoryorder': 'total ascending'})
-                st.plotly_chart(fig, width='stretch')
-        
-        # Display table
-        st.markdown(f"### 📋 {t('reorder_recommendations')} ({len(filtered_df)} items)")
-        
-        # Build display columns - include Units, Pieces, and Quantity
-        display_cols = ['item_code', 'item_name', 'category', 'units', 'pieces', 'quantity', 
-                       'reorder_signal', 'reorder_point', 'days_of_stock', 'daily_sales_velocity', 
-                       'quantity_to_order', 'priority_score']
-        
-        # Select only columns that exist in the data
-        display_df = filtered_df[
-            [col for col in display_cols if col in filtered_df.columns]
-        ].copy()
-        
-        # Add marker to quantity column and translate
-        if 'quantity' in display_df.columns:
-            display_df = display_df.rename(columns={'quantity': 'quantity ⭐'})
-        
-        # Translate all column names
-        display_df = translate_columns(display_df)
-        
-        st.dataframe(
-            display_df,
-            use_container_width=True,
-            hide_index=True
-        )
-        
-        # Add explanation
-        st.info("⭐ **Quantity** is the authoritative stock level used for all calculations. Units & Pieces are informational.")
-        
-        # Download button
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            label=f"📥 {t('download_reorder_list')}",
-            data=csv,
-            file_name=f"reorder_list_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
-        )
+        inventory_reorder_tab(manager, lead_time, urgency_threshold)
     
     with tab3:
         st.subheader(t('stockout_forecast', days=config.STOCKOUT_FORECAST_DAYS))
@@ -2404,7 +2995,7 @@ def inventory_management_page(data):
             stockout_risk['stockout_date'] = pd.to_datetime(stockout_risk['estimated_stockout_date'])
             
             fig = px.scatter(
-                stockout_risk.head(20),
+                stockout_risk.iloc[:20],
                 x='stockout_date',
                 y='item_name',
                 size='daily_sales_velocity',
@@ -2435,12 +3026,11 @@ def inventory_management_page(data):
             display_df = translate_columns(display_df)
             
             # Format dates after translation
-            trans_cols = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-            est_date_col = trans_cols.get('estimated_date', 'Estimated Date')
+            est_date_col = COL_TRANSLATIONS.get('estimated_date', 'Estimated Date')
             if est_date_col in display_df.columns:
                 display_df[est_date_col] = pd.to_datetime(display_df[est_date_col]).dt.strftime('%Y-%m-%d')
             
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
+            st.dataframe(arrow_ready(display_df), use_container_width=True, hide_index=True)
             st.caption("⭐ Quantity is the total stock used for stockout prediction")
         else:
             st.success(f"✓ No items at risk of stockout in the next {config.STOCKOUT_FORECAST_DAYS} days!")
@@ -2458,7 +3048,7 @@ def inventory_management_page(data):
             
             # Overstock value chart
             if 'overstock_value' in overstocked.columns:
-                top_overstock = overstocked.head(15)
+                top_overstock = overstocked.iloc[:15]
                 fig = px.bar(
                     top_overstock,
                     x='item_name',
@@ -2475,7 +3065,7 @@ def inventory_management_page(data):
             display_cols = ['item_name', 'category', 'units', 'pieces', 'quantity', 
                           'days_of_stock', 'daily_sales_velocity', 'overstock_value']
             
-            display_df = overstocked[[col for col in display_cols if col in overstocked.columns]].head(50)
+            display_df = overstocked.iloc[:50][[col for col in display_cols if col in overstocked.columns]]
             
             # Add marker to quantity column and translate
             if 'quantity' in display_df.columns:
@@ -2484,7 +3074,7 @@ def inventory_management_page(data):
             # Translate column names
             display_df = translate_columns(display_df)
             
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
+            st.dataframe(arrow_ready(display_df), use_container_width=True, hide_index=True)
             st.caption("⭐ Quantity is the total stock - high Days of Stock indicates slow-moving items")
         else:
             st.success(f"✓ No overstocked items (>{config.OVERSTOCK_THRESHOLD_DAYS} days of stock)")
@@ -2492,14 +3082,14 @@ def inventory_management_page(data):
     with tab5:
         st.subheader(f"📊 {t('abc_inventory_analysis')}")
         
-        # Get ABC analysis
+        # Get ABC analysis and its per-class totals
         abc_df = manager.get_abc_analysis()
+        abc_counts, abc_revenue = manager.get_abc_summary()
         
         # ABC distribution
         col1, col2 = st.columns(2)
         
         with col1:
-            abc_counts = abc_df['abc_class'].value_counts().sort_index()
             fig = px.pie(
                 values=abc_counts.values,
                 names=abc_counts.index,
@@ -2510,7 +3100,6 @@ def inventory_management_page(data):
             st.plotly_chart(fig, width='stretch')
         
         with col2:
-            abc_revenue = abc_df.groupby('abc_class')['total_revenue'].sum().sort_index()
             fig = px.bar(
                 x=abc_revenue.index,
                 y=abc_revenue.values,
@@ -2526,7 +3115,7 @@ def inventory_management_page(data):
         display_cols = ['item_name', 'abc_class', 'units', 'pieces', 'quantity', 
                        'total_revenue', 'cumulative_revenue_pct', 'total_quantity_sold']
         
-        display_df = abc_df[[col for col in display_cols if col in abc_df.columns]].head(50)
+        display_df = abc_df.iloc[:50][[col for col in display_cols if col in abc_df.columns]]
         
         # Add marker to quantity column and translate
         if 'quantity' in display_df.columns:
@@ -2535,12 +3124,245 @@ def inventory_management_page(data):
         # Translate column names
         display_df = translate_columns(display_df)
         
-        st.dataframe(display_df, use_container_width=True, hide_index=True)
-        st.caption("⭐ Quantity shows current stock | Total Sold shows historical sales | ABC Class based on revenue")
+        st.dataframe(arrow_ready(display_df), use_container_width=True, hide_index=True)
+        st.caption("⭐ Quantity shows current stock | Total Sold shows historical sales | ABC Class based on revenue")
+
+
+@st.fragment
+def rfm_segment_details(analyzer, segment_summary):
+    """Segment drill-down; a fragment so picking a segment reruns only this block."""
+    st.subheader(t('segment_details'))
+    
+    selected_segment = st.selectbox(
+        "Select segment to explore",
+        segment_summary['segment'].tolist(),
+        key='rfm_segment_selector'
+    )
+    
+    segment_customers = analyzer.get_customers_by_segment(selected_segment)
+    
+    # Merge phone numbers
+    segment_customers = analyzer.merge_phone_numbers(segment_customers)
+    
+    st.write(f"**{selected_segment}** - {len(segment_customers)} customers")
+    
+    # Select columns to display (include phone if available)
+    display_cols = ['customer_name', 'phone', 'recency', 'frequency', 'monetary', 
+                   'r_score', 'f_score', 'm_score', 'rfm_score']
+    segment_customers_display = translate_columns(segment_customers.iloc[:20][display_cols].copy())
+    st.dataframe(arrow_ready(format_datetime_columns(segment_customers_display)), use_container_width=True, hide_index=True)
+    
+    # Export buttons
+    col_btn1, col_btn2 = st.columns(2)
+    
+    with col_btn1:
+        phone_count = 0 if analyzer.phone_mapping is None else len(analyzer.phone_mapping)
+        deferred_csv_download(
+            label=f"📥 Download All {selected_segment} Customers (CSV)",
+            df=segment_customers[display_cols],
+            file_name=f"rfm_segment_{selected_segment}_{datetime.now().strftime('%Y%m%d')}.csv",
+            key='download_segment_tab1',
+            token=(get_data_id(), selected_segment, phone_count)
+        )
+    
+    with col_btn2:
+        # Extract non-empty phone numbers
+        phone_numbers = extract_phone_numbers(segment_customers['phone'])
+        phone_list = ', '.join(phone_numbers)
+        
+        if phone_numbers:
+            st.download_button(
+                label=f"📱 Copy Phone Numbers ({len(phone_numbers)})",
+                data=phone_list,
+                file_name=f"phones_{selected_segment}_{datetime.now().strftime('%Y%m%d')}.txt",
+                mime="text/plain",
+                key='copy_phones_tab1'
+            )
+            # Also display in text area for easy copying
+            with st.expander("📋 View Phone Numbers"):
+                st.text_area(
+                    "Phone numbers (comma-separated)",
+                    value=phone_list,
+                    height=100,
+                    key='phones_display_tab1',
+                    help="Select all (Ctrl+A) and copy (Ctrl+C)"
+                )
+        else:
+            st.info("📱 No phone numbers available")
+
+
+@st.fragment
+def rfm_category_tab(analyzer):
+    """RFM by Category tab; a fragment so its filters rerun only this tab."""
+    px = _px()
+    st.subheader(f"📂 {t('rfm_by_category')}")
+    st.markdown("""
+    This view shows how customers behave within each product category. 
+    A customer might be a **Champion** in one category but **At Risk** in another!
+    """)
+    
+    # Get RFM by category data, pre-split per category
+    category_groups = analyzer.get_rfm_by_category_groups()
+    category_summary_groups = analyzer.get_category_segment_summary_groups()
+    
+    # Get list of categories
+    categories = sorted(category_groups)
+    
+    # Category selector
+    selected_category = st.selectbox(
+        "Select Product Category",
+        categories,
+        key='rfm_category_select'
+    )
+    
+    # Look up the selected category and merge phone numbers into it only
+    category_data = analyzer.merge_phone_numbers(category_groups[selected_category])
+    category_summary = category_summary_groups[selected_category]
+    
+    # Display metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Customers", f"{len(category_data):,}")
+    with col2:
+        st.metric("Total Revenue", f"${category_data['monetary'].sum():,.2f}")
+    with col3:
+        st.metric("Avg Customer Value", f"${category_data['monetary'].mean():,.2f}")
+    
+    # Visualizations
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Segment distribution pie chart
+        fig_pie = px.pie(
+            category_summary,
+            values='customer_count',
+            names='segment',
+            title=f'Customer Segments in {selected_category}',
+            hole=0.4
+        )
+        fig_pie.update_layout(height=600)
+        st.plotly_chart(fig_pie, width='stretch')
+    
+    with col2:
+        # Revenue by segment bar chart
+        fig_bar = px.bar(
+            category_summary,
+            x='segment',
+            y='total_revenue',
+            title=f'Revenue by Segment - {selected_category}',
+            color='total_revenue',
+            color_continuous_scale='Viridis'
+        )
+        fig_bar.update_xaxes(tickangle=-45)
+        st.plotly_chart(fig_bar, width='stretch')
+    
+    # Summary table
+    st.markdown(f"#### Segment Summary for {selected_category}")
+    display_summary = category_summary[[
+        'segment', 'customer_count', 'total_revenue', 'pct_of_category', 
+        'avg_recency', 'avg_frequency'
+    ]].copy()
+    
+    # Rename to match translation keys
+    display_summary.columns = ['segment', 'customers', 'revenue', 'revenue_pct', 'recency', 'frequency']
+    display_summary = translate_columns(display_summary)
+    
+    # Get translated column names for formatting
+    cust_col = COL_TRANSLATIONS.get('customers', 'Customers')
+    rev_col = COL_TRANSLATIONS.get('revenue', 'Revenue')
+    rev_pct_col = COL_TRANSLATIONS.get('revenue_pct', '% of Category')
+    rec_col = COL_TRANSLATIONS.get('recency', 'Recency')
+    freq_col = COL_TRANSLATIONS.get('frequency', 'Frequency')
+    
+    st.dataframe(
+        display_summary.style.format({
+            cust_col: '{:,.0f}',
+            rev_col: '${:,.2f}',
+            rev_pct_col: '{:.1f}%',
+            rec_col: '{:.0f}',
+            freq_col: '{:.1f}'
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    # Customer details by segment
+    st.markdown("#### Customer Details")
+    
+    # Get segments available in this category
+    available_segments = category_summary['segment'].tolist()
+    
+    selected_segment_cat = st.selectbox(
+        "Filter by Segment (optional)",
+        ['All Segments'] + available_segments,
+        key='rfm_segment_filter'
+    )
+    
+    # Filter customers
+    if selected_segment_cat == 'All Segments':
+        customers_display = category_data
+    else:
+        customers_display = category_data[category_data['segment'] == selected_segment_cat]
+    
+    # Display ALL filtered customers (not just top 50)
+    st.write(f"Showing all {len(customers_display)} customers")
+    
+    # Select columns to display (include phone)
+    display_cols = ['customer_name', 'phone', 'segment', 'recency', 'frequency', 'monetary']
+    # Money is formatted client-side so the column still sorts numerically
+    # (recency and frequency are already whole numbers)
+    display_customers = translate_columns(customers_display[display_cols])
+    
+    st.dataframe(
+        arrow_ready(display_customers),
+        use_container_width=True,
+        hide_index=True,
+        height=600,  # Set a fixed height with scrolling
+        column_config=number_column_config({'monetary': MONEY_FORMAT})
+    )
+    
+    # Download options for filtered data
+    col_btn1, col_btn2 = st.columns(2)
+    
+    with col_btn1:
+        phone_count = 0 if analyzer.phone_mapping is None else len(analyzer.phone_mapping)
+        deferred_csv_download(
+            label=f"📥 Download Filtered Customer Data (CSV)",
+            df=customers_display[display_cols],
+            file_name=f"rfm_{selected_category}_{selected_segment_cat}_{datetime.now().strftime('%Y%m%d')}.csv",
+            key='download_category_segment',
+            token=(get_data_id(), selected_category, selected_segment_cat, phone_count)
+        )
+    
+    with col_btn2:
+        # Extract non-empty phone numbers
+        phone_numbers = extract_phone_numbers(customers_display['phone'])
+        phone_list = ', '.join(phone_numbers)
+        
+        if phone_numbers:
+            st.download_button(
+                label=f"📱 Copy Phone Numbers ({len(phone_numbers)})",
+                data=phone_list,
+                file_name=f"phones_{selected_category}_{selected_segment_cat}_{datetime.now().strftime('%Y%m%d')}.txt",
+                mime="text/plain",
+                key='copy_phones_tab2'
+            )
+            # Also display in text area for easy copying
+            with st.expander("📋 View Phone Numbers"):
+                st.text_area(
+                    "Phone numbers (comma-separated)",
+                    value=phone_list,
+                    height=100,
+                    key='phones_display_tab2',
+                    help="Select all (Ctrl+A) and copy (Ctrl+C)"
+                )
+        else:
+            st.info("📱 No phone numbers available")
 
 
 def rfm_analysis_page(data):
     """RFM segmentation section."""
+    px = _px()
     st.header(f"🎯 {t('rfm_title')}")
     
     st.markdown(f"""
@@ -2580,7 +3402,7 @@ def rfm_analysis_page(data):
     st.markdown("---")
     
     # Initialize RFM analyzer
-    analyzer = get_rfm_analyzer(data)
+    analyzer = get_rfm_analyzer(data, get_data_id())
     
     # Load phone mapping if file is uploaded
     if phone_file is not None:
@@ -2637,257 +3459,29 @@ def rfm_analysis_page(data):
             fig.update_xaxes(tickangle=-45)
             st.plotly_chart(fig, width='stretch')
         
-        segment_summary_display = translate_columns(segment_summary.copy())
-        st.dataframe(format_datetime_columns(segment_summary_display), use_container_width=True, hide_index=True)
-        
-        # Segment details
-        st.subheader(t('segment_details'))
-        
-        selected_segment = st.selectbox(
-            "Select segment to explore",
-            segment_summary['segment'].tolist(),
-            key='rfm_segment_selector'
-        )
-        
-        segment_customers = analyzer.get_customers_by_segment(selected_segment)
-        
-        # Merge phone numbers
-        segment_customers = analyzer.merge_phone_numbers(segment_customers)
-        
-        st.write(f"**{selected_segment}** - {len(segment_customers)} customers")
-        
-        # Select columns to display (include phone if available)
-        display_cols = ['customer_name', 'phone', 'recency', 'frequency', 'monetary', 
-                       'r_score', 'f_score', 'm_score', 'rfm_score']
-        segment_customers_display = translate_columns(segment_customers.head(20)[display_cols].copy())
-        st.dataframe(format_datetime_columns(segment_customers_display), use_container_width=True, hide_index=True)
+        segment_summary_display = translate_columns(segment_summary)
+        st.dataframe(arrow_ready(format_datetime_columns(segment_summary_display)), use_container_width=True, hide_index=True)
         
-        # Export buttons
-        col_btn1, col_btn2 = st.columns(2)
-        
-        with col_btn1:
-            csv_segment = segment_customers[display_cols].to_csv(index=False)
-            st.download_button(
-                label=f"📥 Download All {selected_segment} Customers (CSV)",
-                data=csv_segment,
-                file_name=f"rfm_segment_{selected_segment}_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                key='download_segment_tab1'
-            )
-        
-        with col_btn2:
-            # Extract non-empty phone numbers
-            phone_numbers = segment_customers['phone'].astype(str).str.strip()
-            phone_numbers = phone_numbers[phone_numbers != ''].tolist()
-            phone_list = ', '.join(phone_numbers)
-            
-            if phone_numbers:
-                st.download_button(
-                    label=f"📱 Copy Phone Numbers ({len(phone_numbers)})",
-                    data=phone_list,
-                    file_name=f"phones_{selected_segment}_{datetime.now().strftime('%Y%m%d')}.txt",
-                    mime="text/plain",
-                    key='copy_phones_tab1'
-                )
-                # Also display in text area for easy copying
-                with st.expander("📋 View Phone Numbers"):
-                    st.text_area(
-                        "Phone numbers (comma-separated)",
-                        value=phone_list,
-                        height=100,
-                        key='phones_display_tab1',
-                        help="Select all (Ctrl+A) and copy (Ctrl+C)"
-                    )
-            else:
-                st.info("📱 No phone numbers available")
+        rfm_segment_details(analyzer, segment_summary)
     
     with tab2:
-        st.subheader(f"📂 {t('rfm_by_category')}")
-        st.markdown("""
-        This view shows how customers behave within each product category. 
-        A customer might be a **Champion** in one category but **At Risk** in another!
-        """)
-        
-        # Get RFM by category data
-        rfm_by_category = analyzer.calculate_rfm_by_category()
-        
-        # Merge phone numbers into category data
-        rfm_by_category = analyzer.merge_phone_numbers(rfm_by_category)
-        
-        category_segment_summary = analyzer.get_category_segment_summary()
-        
-        # Get list of categories
-        categories = sorted(rfm_by_category['category'].unique())
-        
-        # Category selector
-        selected_category = st.selectbox(
-            "Select Product Category",
-            categories,
-            key='rfm_category_select'
-        )
-        
-        # Filter data for selected category
-        category_data = rfm_by_category[rfm_by_category['category'] == selected_category]
-        category_summary = category_segment_summary[category_segment_summary['category'] == selected_category]
-        
-        # Display metrics
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Customers", f"{len(category_data):,}")
-        with col2:
-            st.metric("Total Revenue", f"${category_data['monetary'].sum():,.2f}")
-        with col3:
-            st.metric("Avg Customer Value", f"${category_data['monetary'].mean():,.2f}")
-        
-        # Visualizations
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Segment distribution pie chart
-            fig_pie = px.pie(
-                category_summary,
-                values='customer_count',
-                names='segment',
-                title=f'Customer Segments in {selected_category}',
-                hole=0.4
-            )
-            fig_pie.update_layout(height=600)
-            st.plotly_chart(fig_pie, width='stretch')
-        
-        with col2:
-            # Revenue by segment bar chart
-            fig_bar = px.bar(
-                category_summary,
-                x='segment',
-                y='total_revenue',
-                title=f'Revenue by Segment - {selected_category}',
-                color='total_revenue',
-                color_continuous_scale='Viridis'
-            )
-            fig_bar.update_xaxes(tickangle=-45)
-            st.plotly_chart(fig_bar, width='stretch')
-        
-        # Summary table
-        st.markdown(f"#### Segment Summary for {selected_category}")
-        display_summary = category_summary[[
-            'segment', 'customer_count', 'total_revenue', 'pct_of_category', 
-            'avg_recency', 'avg_frequency'
-        ]].copy()
-        
-        # Rename to match translation keys
-        display_summary.columns = ['segment', 'customers', 'revenue', 'revenue_pct', 'recency', 'frequency']
-        display_summary = translate_columns(display_summary)
-        
-        # Get translated column names for formatting
-        trans_cols = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-        cust_col = trans_cols.get('customers', 'Customers')
-        rev_col = trans_cols.get('revenue', 'Revenue')
-        rev_pct_col = trans_cols.get('revenue_pct', '% of Category')
-        rec_col = trans_cols.get('recency', 'Recency')
-        freq_col = trans_cols.get('frequency', 'Frequency')
-        
-        st.dataframe(
-            display_summary.style.format({
-                cust_col: '{:,.0f}',
-                rev_col: '${:,.2f}',
-                rev_pct_col: '{:.1f}%',
-                rec_col: '{:.0f}',
-                freq_col: '{:.1f}'
-            }),
-            use_container_width=True,
-            hide_index=True
-        )
-        
-        # Customer details by segment
-        st.markdown("#### Customer Details")
-        
-        # Get segments available in this category
-        available_segments = category_summary['segment'].tolist()
-        
-        selected_segment_cat = st.selectbox(
-            "Filter by Segment (optional)",
-            ['All Segments'] + available_segments,
-            key='rfm_segment_filter'
-        )
-        
-        # Filter customers
-        if selected_segment_cat == 'All Segments':
-            customers_display = category_data
-        else:
-            customers_display = category_data[category_data['segment'] == selected_segment_cat]
-        
-        # Display ALL filtered customers (not just top 50)
-        st.write(f"Showing all {len(customers_display)} customers")
-        
-        # Select columns to display (include phone)
-        display_cols = ['customer_name', 'phone', 'segment', 'recency', 'frequency', 'monetary']
-        display_customers = customers_display[display_cols].copy()
-        display_customers = translate_columns(display_customers)
-        
-        # Get translated column names for formatting
-        trans_cols = config.COLUMN_TRANSLATIONS.get(CURRENT_LANG, config.COLUMN_TRANSLATIONS['en'])
-        rec_col = trans_cols.get('recency', 'Recency')
-        freq_col = trans_cols.get('frequency', 'Frequency')
-        mon_col = trans_cols.get('monetary', 'Monetary')
-        
-        st.dataframe(
-            display_customers.style.format({
-                rec_col: '{:.0f}',
-                freq_col: '{:.0f}',
-                mon_col: '${:,.2f}'
-            }),
-            use_container_width=True,
-            hide_index=True,
-            height=600  # Set a fixed height with scrolling
-        )
-        
-        # Download options for filtered data
-        col_btn1, col_btn2 = st.columns(2)
-        
-        with col_btn1:
-            csv_filtered = customers_display[display_cols].to_csv(index=False)
-            st.download_button(
-                label=f"📥 Download Filtered Customer Data (CSV)",
-                data=csv_filtered,
-                file_name=f"rfm_{selected_category}_{selected_segment_cat}_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                key='download_category_segment'
-            )
-        
-        with col_btn2:
-            # Extract non-empty phone numbers
-            phone_numbers = customers_display['phone'].astype(str).str.strip()
-            phone_numbers = phone_numbers[phone_numbers != ''].tolist()
-            phone_list = ', '.join(phone_numbers)
-            
-            if phone_numbers:
-                st.download_button(
-                    label=f"📱 Copy Phone Numbers ({len(phone_numbers)})",
-                    data=phone_list,
-                    file_name=f"phones_{selected_category}_{selected_segment_cat}_{datetime.now().strftime('%Y%m%d')}.txt",
-                    mime="text/plain",
-                    key='copy_phones_tab2'
-                )
-                # Also display in text area for easy copying
-                with st.expander("📋 View Phone Numbers"):
-                    st.text_area(
-                        "Phone numbers (comma-separated)",
-                        value=phone_list,
-                        height=100,
-                        key='phones_display_tab2',
-                        help="Select all (Ctrl+A) and copy (Ctrl+C)"
-                    )
-            else:
-                st.info("📱 No phone numbers available")
+        rfm_category_tab(analyzer)
+
+
+REFILL_HOVER_COLUMNS = (
+    'avg_interval_days', 'first_order_date', 'days_since_first_order',
+    'predicted_order_value', 'predicted_quantity'
+)
 
 
 def refill_prediction_page(data):
     """Advanced refill prediction section with price forecasting."""
+    px = _px()
     st.header(f"💊 {t('refill_title')}")
     
     st.markdown(t('refill_description'))
     
-    predictor = get_refill_predictor(data)
+    predictor = get_refill_predictor(data, get_data_id())
     intervals_df = predictor.calculate_purchase_intervals(include_price_prediction=True)
     
     # Enhanced summary metrics
@@ -2940,16 +3534,8 @@ def refill_prediction_page(data):
                 st.info(f"{len(upcoming)} refills expected in the next {days_ahead} days")
             
             # Timeline
-            # Build hover_data dynamically based on available columns
-            hover_cols = ['avg_interval_days']
-            if 'first_order_date' in upcoming.columns:
-                hover_cols.append('first_order_date')
-            if 'days_since_first_order' in upcoming.columns:
-                hover_cols.append('days_since_first_order')
-            if 'predicted_order_value' in upcoming.columns:
-                hover_cols.append('predicted_order_value')
-            if 'predicted_quantity' in upcoming.columns:
-                hover_cols.append('predicted_quantity')
+            # Build hover_data based on available columns
+            hover_cols = [col for col in REFILL_HOVER_COLUMNS if col in upcoming.columns]
             
             fig = px.scatter(
                 upcoming,
@@ -2958,12 +3544,13 @@ def refill_prediction_page(data):
                 color='item_name',
                 size='confidence_score',
                 title=f'Refill Timeline (Next {days_ahead} Days)',
-                hover_data=hover_cols
+                hover_data=hover_cols,
+                render_mode='webgl'
             )
             st.plotly_chart(fig, width='stretch')
             
-            upcoming_display = translate_columns(upcoming.copy())
-            st.dataframe(format_datetime_columns(upcoming_display), use_container_width=True, hide_index=True)
+            upcoming_display = translate_columns(upcoming)
+            st.dataframe(arrow_ready(format_datetime_columns(upcoming_display)), use_container_width=True, hide_index=True)
         else:
             st.info(f"No refills expected in the next {days_ahead} days")
     
@@ -2982,42 +3569,39 @@ def refill_prediction_page(data):
         
         overdue = predictor.get_overdue_refills(tolerance)
         
-        # Filter based on adjustable period
         total_overdue = len(overdue)
-        if len(overdue) > 0 and 'last_purchase_date' in overdue.columns:
-            # Calculate days since last purchase from current date
-            from datetime import datetime
-            current_date = predictor.current_date
-            overdue['days_since_last_purchase'] = (current_date - overdue['last_purchase_date']).dt.days
-            
-            # Filter to only show within selected period
-            overdue = overdue[overdue['days_since_last_purchase'] <= max_overdue_days].copy()
+        
+        # Dynamic status classification based on max_overdue_days
+        likely_lost_threshold = max_overdue_days * 0.75  # Top 25%
+        high_risk_threshold = max_overdue_days * 0.50   # 50-75%
+        at_risk_threshold = max_overdue_days * 0.25     # 25-50%
+        # Below 25% = Action Needed
+        
+        # Filter based on adjustable period
+        if total_overdue > 0 and 'days_since_last_purchase' in overdue.columns:
+            # Days since last purchase come precomputed from the predictor
+            # Filter to only show within selected period (the predictor's cached
+            # frame is left untouched; statuses are re-tiered on the filtered copy)
+            in_period = overdue['days_since_last_purchase'].to_numpy() <= max_overdue_days
+            overdue = overdue[in_period].copy()
             filtered_count = len(overdue)
             excluded_count = total_overdue - filtered_count
             
-            # Dynamic status classification based on max_overdue_days
-            # Divide the period into 4 tiers
-            tier_size = max_overdue_days / 4
-            likely_lost_threshold = max_overdue_days * 0.75  # Top 25%
-            high_risk_threshold = max_overdue_days * 0.50   # 50-75%
-            at_risk_threshold = max_overdue_days * 0.25     # 25-50%
-            # Below 25% = Action Needed
-            
-            def reclassify_status(row):
-                days_overdue = row['days_overdue']
-                if days_overdue >= likely_lost_threshold:
-                    return 'Likely Lost'
-                elif days_overdue >= high_risk_threshold:
-                    return 'At High Risk'
-                elif days_overdue >= at_risk_threshold:
-                    return 'At Risk'
-                else:
-                    return 'Action Needed'
-            
-            overdue['customer_status'] = overdue.apply(reclassify_status, axis=1)
-            
             if excluded_count > 0:
                 st.info(f"📅 Showing overdue refills from past {max_overdue_days} days ({filtered_count} shown, {excluded_count} older excluded)")
+            
+            # Re-tier statuses only when something is left to show
+            if filtered_count > 0:
+                days_overdue = overdue['days_overdue'].to_numpy()
+                overdue['customer_status'] = np.select(
+                    [
+                        days_overdue >= likely_lost_threshold,
+                        days_overdue >= high_risk_threshold,
+                        days_overdue >= at_risk_threshold
+                    ],
+                    ['Likely Lost', 'At High Risk', 'At Risk'],
+                    default='Action Needed'
+                )
         
         if len(overdue) > 0:
             # Status breakdown with dynamic thresholds
@@ -3089,8 +3673,8 @@ def refill_prediction_page(data):
             
             # Full data table
             st.markdown("### 📋 Complete Overdue List")
-            overdue_display = translate_columns(overdue.copy())
-            st.dataframe(format_datetime_columns(overdue_display), use_container_width=True, hide_index=True)
+            overdue_display = translate_columns(overdue)
+            st.dataframe(arrow_ready(format_datetime_columns(overdue_display)), use_container_width=True, hide_index=True)
         else:
             if total_overdue > 0:
                 st.info(f"📅 No overdue refills in the past {max_overdue_days} days. ({total_overdue} customers haven't ordered in {max_overdue_days}+ days - likely lost)")
@@ -3101,8 +3685,9 @@ def refill_prediction_page(data):
         st.subheader(t('customer_refill_schedule'))
         
         # Customer selection
-        customers = data['customer_name'].unique()
-        selected_customer = st.selectbox("Select customer", sorted([str(c) for c in customers]), key='refill_customer_selector')
+        data_id = get_data_id()
+        customers = get_sorted_names(get_categorical_keys(data, data_id)['customer_name'], data_id, 'customer_name')
+        selected_customer = st.selectbox("Select customer", customers, key='refill_customer_selector')
         
         schedule = predictor.get_customer_refill_schedule(selected_customer)
         
@@ -3121,8 +3706,8 @@ def refill_prediction_page(data):
                     else:
                         st.success(f"{status}: {count}")
             
-            schedule_display = translate_columns(schedule.copy())
-            st.dataframe(format_datetime_columns(schedule_display), use_container_width=True, hide_index=True)
+            schedule_display = translate_columns(schedule)
+            st.dataframe(arrow_ready(format_datetime_columns(schedule_display)), use_container_width=True, hide_index=True)
         else:
             st.info("No refill history for this customer")
     
@@ -3144,12 +3729,12 @@ def refill_prediction_page(data):
                  'predicted_order_value', 'predicted_unit_price', 
                  'predicted_quantity', 'confidence_score', 'regularity_score', 
                  'price_trend', 'total_lifetime_value']
-            ].copy()
+            ]
             
             # Format for display
             st.write("**Top 20 Predicted Order Values**")
-            top_predictions_display = translate_columns(top_predictions.copy())
-            st.dataframe(format_datetime_columns(top_predictions_display), use_container_width=True, hide_index=True)
+            top_predictions_display = translate_columns(top_predictions)
+            st.dataframe(arrow_ready(format_datetime_columns(top_predictions_display)), use_container_width=True, hide_index=True)
             
             # Price trend analysis
             st.markdown("---")
@@ -3157,9 +3742,15 @@ def refill_prediction_page(data):
             
             with col1:
                 st.write("**📈 Price Trend Distribution**")
-                increasing_prices = len(intervals_df[intervals_df['price_trend'] > 0.1])
-                stable_prices = len(intervals_df[abs(intervals_df['price_trend']) <= 0.1])
-                decreasing_prices = len(intervals_df[intervals_df['price_trend'] < -0.1])
+                price_trend = intervals_df['price_trend'].to_numpy()
+                trend_counts = pd.Series(np.select(
+                    [price_trend > 0.1, price_trend < -0.1, np.abs(price_trend) <= 0.1],
+                    ['Increasing', 'Decreasing', 'Stable'],
+                    default=''
+                )).value_counts()
+                increasing_prices = trend_counts.get('Increasing', 0)
+                stable_prices = trend_counts.get('Stable', 0)
+                decreasing_prices = trend_counts.get('Decreasing', 0)
                 
                 trend_data = pd.DataFrame({
                     'Trend': ['Increasing', 'Stable', 'Decreasing'],
@@ -3175,9 +3766,15 @@ def refill_prediction_page(data):
             
             with col2:
                 st.write("**🎯 Regularity Score Distribution**")
-                high_reg = len(intervals_df[intervals_df['regularity_score'] >= 70])
-                med_reg = len(intervals_df[(intervals_df['regularity_score'] >= 40) & (intervals_df['regularity_score'] < 70)])
-                low_reg = len(intervals_df[intervals_df['regularity_score'] < 40])
+                regularity_counts = pd.cut(
+                    intervals_df['regularity_score'],
+                    bins=[-np.inf, 40, 70, np.inf],
+                    labels=['Low', 'Medium', 'High'],
+                    right=False
+                ).value_counts()
+                high_reg = regularity_counts['High']
+                med_reg = regularity_counts['Medium']
+                low_reg = regularity_counts['Low']
                 
                 reg_data = pd.DataFrame({
                     'Regularity': ['High (70+)', 'Medium (40-70)', 'Low (<40)'],
@@ -3213,8 +3810,55 @@ def refill_prediction_page(data):
             st.info("Not enough data for price predictions")
 
 
+def build_affinity_matrix(affinity, products):
+    """
+    Build a symmetric product x product lift matrix for the affinity heatmap.
+    
+    For each pair the lift of the first matching row in affinity (in either
+    direction) is used; pairs without an association and the diagonal are 0.
+    """
+    k = len(products)
+    
+    # Map both product columns to matrix positions (-1 when not in products)
+    ia = pd.Categorical(affinity['product_a'], categories=products).codes.astype(np.int64)
+    ib = pd.Categorical(affinity['product_b'], categories=products).codes.astype(np.int64)
+    keep = (ia >= 0) & (ib >= 0) & (ia != ib)
+    lo = np.minimum(ia, ib)[keep]
+    hi = np.maximum(ia, ib)[keep]
+    lifts = affinity['lift'].to_numpy(dtype=float)[keep]
+    
+    # Keep the first row per unordered pair, then scatter it into both halves
+    _, first = np.unique(lo * k + hi, return_index=True)
+    matrix = np.zeros((k, k))
+    matrix[lo[first], hi[first]] = lifts[first]
+    matrix[hi[first], lo[first]] = lifts[first]
+    
+    return matrix
+
+
+def basket_size_distribution(order_ids, item_names):
+    """
+    Count orders by number of distinct items, indexed by basket size.
+    
+    Same result as groupby('order_id')['item_name'].nunique().value_counts().sort_index(),
+    computed on factorized integer codes instead of per-group hash sets.
+    """
+    order_codes, order_uniques = pd.factorize(order_ids)
+    item_codes, item_uniques = pd.factorize(item_names)
+    
+    # Drop rows with a missing order id (groupby drops them) or missing item (nunique skips them)
+    valid = (order_codes >= 0) & (item_codes >= 0)
+    n_items = max(len(item_uniques), 1)
+    
+    unique_pairs = np.unique(order_codes[valid].astype(np.int64) * n_items + item_codes[valid])
+    sizes = np.bincount(unique_pairs // n_items, minlength=len(order_uniques))
+    
+    return pd.Series(sizes).value_counts().sort_index()
+
+
 def cross_sell_page(data):
     """Cross-sell analysis section."""
+    px = _px()
     st.header(f"🔗 {t('cross_sell_title')}")
     
     st.markdown(f"""
@@ -3238,7 +3882,7 @@ def cross_sell_page(data):
                                        help="More records = more accurate but slower",
                                        key='crosssell_max_records')
     
-    analyzer = get_cross_sell_analyzer(data, _enable_sampling=enable_sampling, _max_records=max_records)
+    analyzer = get_cross_sell_analyzer(data, get_data_id(), _enable_sampling=enable_sampling, _max_records=max_records)
     
     # Show diagnostics in expander
     with st.expander("📊 Analysis Diagnostics & Data Quality", expanded=False):
@@ -3284,7 +3928,7 @@ def cross_sell_page(data):
             st.success(f"✓ Found {len(bundles)} product bundles!")
             
             # Show summary table
-            bundles_display = bundles[['bundle_items', 'itemset_size', 'bundle_frequency', 'support', 'bundle_revenue', 'avg_basket_value']].copy()
+            bundles_display = bundles[['bundle_items', 'itemset_size', 'bundle_frequency', 'support', 'bundle_revenue', 'avg_basket_value']]
             bundles_display = translate_columns(bundles_display)
             st.dataframe(
                 bundles_display,
@@ -3296,29 +3940,40 @@ def cross_sell_page(data):
             st.markdown("---")
             st.markdown("### Bundle Details")
             
-            for idx, row in bundles.iterrows():
-                support_pct = row['support'] * 100
-                freq = row.get('bundle_frequency', int(row['support'] * analyzer.data['order_id'].nunique()))
-                
+            # Precompute per-bundle metrics once instead of per row
+            support_pcts = bundles['support'].to_numpy() * 100
+            if 'bundle_frequency' in bundles.columns:
+                freqs = bundles['bundle_frequency'].to_numpy()
+            else:
+                freqs = (bundles['support'] * analyzer.data['order_id'].nunique()).astype(int).to_numpy()
+            if 'avg_basket_value' in bundles.columns:
+                avg_basket_values = bundles['avg_basket_value'].to_numpy()
+            else:
+                avg_basket_values = np.zeros(len(bundles))
+            
+            for row, support_pct, freq, avg_basket_value in zip(
+                bundles.itertuples(index=True), support_pcts, freqs, avg_basket_values
+            ):
                 with st.expander(
-                    f"Bundle {idx + 1}: {row['itemset_size']} items | "
+                    f"Bundle {row.Index + 1}: {row.itemset_size} items | "
                     f"Appears in {freq} orders ({support_pct:.1f}%) | "
-                    f"Revenue: ${row['bundle_revenue']:,.2f}"
+                    f"Revenue: ${row.bundle_revenue:,.2f}"
                 ):
                     col_a, col_b = st.columns(2)
                     
                     with col_a:
                         st.write("**Bundle Items:**")
-                        for item in row['bundle_items']:
-                            st.write(f"• {item}")
+                        st.write("  \n".join(f"• {item}" for item in row.bundle_items))
                     
                     with col_b:
                         st.write("**Bundle Metrics:**")
-                        st.write(f"• Frequency: {freq} times")
-                        st.write(f"• Support: {support_pct:.2f}%")
-                        st.write(f"• Total Revenue: ${row['bundle_revenue']:,.2f}")
-                        st.write(f"• Avg Basket Value: ${row.get('avg_basket_value', 0):,.2f}")
-                        st.write(f"• Bundle Score: {row['score']:.2f}")
+                        st.write(
+                            f"• Frequency: {freq} times  \n"
+                            f"• Support: {support_pct:.2f}%  \n"
+                            f"• Total Revenue: ${row.bundle_revenue:,.2f}  \n"
+                            f"• Avg Basket Value: ${avg_basket_value:,.2f}  \n"
+                            f"• Bundle Score: {row.score:.2f}"
+                        )
         else:
             st.warning("⚠️ No product bundles found with current settings.")
             st.info(
@@ -3357,7 +4012,7 @@ def cross_sell_page(data):
             if len(affinity_filtered) > 0:
                 # Top associations
                 st.write(f"**Top {len(affinity_filtered)} Product Pairs (by Lift)**")
-                affinity_display = translate_columns(affinity_filtered.copy())
+                affinity_display = translate_columns(affinity_filtered)
                 st.dataframe(format_datetime_columns(affinity_display), use_container_width=True, hide_index=True)
                 
                 # Heatmap of top products
@@ -3371,16 +4026,7 @@ def cross_sell_page(data):
                     ))[:10]
                     
                     # Create co-occurrence matrix
-                    matrix = np.zeros((len(top_products), len(top_products)))
-                    for i, prod_a in enumerate(top_products):
-                        for j, prod_b in enumerate(top_products):
-                            if i != j:
-                                matching = affinity[
-                                    ((affinity['product_a'] == prod_a) & (affinity['product_b'] == prod_b)) |
-                                    ((affinity['product_a'] == prod_b) & (affinity['product_b'] == prod_a))
-                                ]
-                                if len(matching) > 0:
-                                    matrix[i, j] = matching.iloc[0]['lift']
+                    matrix = build_affinity_matrix(affinity, top_products)
                     
                     fig = px.imshow(
                         matrix,
@@ -3425,7 +4071,8 @@ def cross_sell_page(data):
             st.metric("Multi-Item Baskets", f"{basket_insights['pct_multi_item_baskets']:.1f}%")
         
         # Basket size distribution
-        basket_sizes = data.groupby('order_id')['item_name'].nunique().value_counts().sort_index()
+        keys = get_categorical_keys(data, get_data_id())
+        basket_sizes = basket_size_distribution(keys['order_id'], keys['item_name'])
         fig = px.bar(
             x=basket_sizes.index,
             y=basket_sizes.values,
@@ -3443,7 +4090,8 @@ def cross_sell_page(data):
         """)
         
         # Product selection
-        products = sorted([str(p) for p in data['item_name'].unique()])
+        data_id = get_data_id()
+        products = get_sorted_names(get_categorical_keys(data, data_id)['item_name'], data_id, 'item_name')
         
         col1, col2 = st.columns([3, 1])
         with col1:
@@ -3479,7 +4127,7 @@ def cross_sell_page(data):
                 
                 # Detailed table
                 st.markdown("### Detailed Recommendations")
-                recommendations_display = translate_columns(recommendations.copy())
+                recommendations_display = translate_columns(recommendations)
                 st.dataframe(format_datetime_columns(recommendations_display), use_container_width=True, hide_index=True)
                 
                 # Explanations
@@ -3515,12 +4163,36 @@ def cross_sell_page(data):
                 st.warning(f"⚠️ No strong associations found for '{selected_product}'")
                 
                 # Show what products this item was purchased with at all
-                orders_with_product = data[data['item_name'] == selected_product]['order_id'].unique()
+                # Match on category codes and build one fused mask in NumPy
+                keys = get_categorical_keys(data, get_data_id())
+                order_codes = keys['order_id'].cat.codes.to_numpy()
+                item_codes = keys['item_name'].cat.codes.to_numpy()
+                product_code = keys['item_name'].cat.categories.get_indexer([selected_product])[0]
+                if product_code >= 0:
+                    is_product = item_codes == product_code
+                    orders_with_product = np.unique(order_codes[is_product])
+                else:
+                    is_product = np.zeros(len(item_codes), dtype=bool)
+                    orders_with_product = order_codes[:0]
                 if len(orders_with_product) > 0:
-                    other_items = data[
-                        (data['order_id'].isin(orders_with_product)) & 
-                        (data['item_name'] != selected_product)
-                    ]['item_name'].value_counts().head(10)
+                    # Flag matching orders in a lookup table and gather it by code
+                    # (one linear pass; the extra slot absorbs the -1 code of missing ids)
+                    order_hit = np.zeros(len(keys['order_id'].cat.categories) + 1, dtype=bool)
+                    order_hit[orders_with_product] = True
+                    in_orders = order_hit[order_codes]
+                    in_orders &= ~is_product
+                    # Count codes directly: value_counts on the categorical would
+                    # also list every unobserved product with a count of 0
+                    item_counts = np.bincount(
+                        item_codes[in_orders & (item_codes >= 0)],
+                        minlength=len(keys['item_name'].cat.categories)
+                    )
+                    other_items = pd.Series(
+                        item_counts, index=keys['item_name'].cat.categories
+                    )
+                    other_items = other_items[other_items > 0].sort_values(
+                        ascending=False, kind='stable'
+                    ).head(10)
                     
                     if len(other_items) > 0:
                         st.info(
@@ -3528,10 +4200,7 @@ def cross_sell_page(data):
                             f"Here are the top items bought in those same orders:"
                         )
                         st.dataframe(
-                            pd.DataFrame({
-                                'Product': other_items.index,
-                                'Times': other_items.values
-                            }),
+                            other_items.rename_axis('Product').reset_index(name='Times'),
                             use_container_width=True,
                             hide_index=True
                         )
@@ -3541,6 +4210,107 @@ def cross_sell_page(data):
                     st.error(f"Product '{selected_product}' not found in any orders.")
 
 
+# Chat messages shown as individual bubbles; older ones are folded together
+CHAT_RECENT_MESSAGES = 10
+
+
+# Distinct AI answer charts kept cached
+ANSWER_CHART_CACHE_ENTRIES = 16
+
+
+@st.cache_data(show_spinner=False, max_entries=ANSWER_CHART_CACHE_ENTRIES)
+def build_answer_chart(_df, answer_key, viz_type, x, y, title):
+    """
+    Build and cache the chart for an AI query answer.
+    
+    Bars use go.Bar and lines use a WebGL Scattergl trace (downsampled with
+    LTTB beyond LTTB_THRESHOLD points). Keyed by answer_key (data_id, question
+    and executed code) and the chart config, so the answer frame is not hashed.
+    """
+    df = _df
+    if viz_type == 'bar_chart':
+        trace = go.Bar(x=df[x], y=df[y])
+    else:
+        # Downsample long numeric/datetime series so the browser only draws
+        # about LTTB_POINTS points
+        if len(df) > LTTB_THRESHOLD and pd.api.types.is_numeric_dtype(df[y]):
+            df = lttb_sample(df, x, y, LTTB_POINTS)
+        trace = go.Scattergl(x=df[x], y=df[y], mode='lines+markers')
+    fig = go.Figure(trace)
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+@st.fragment
+def ai_chat_panel(engine):
+    """GPT chat panel; a fragment so chat input reruns only the conversation."""
+    st.markdown("---")
+    st.subheader(t('ai_chat'))
+    st.markdown("Have a conversation with the AI about your sales data")
+    
+    # Initialize chat history in session state
+    if 'chat_messages' not in st.session_state:
+        st.session_state.chat_messages = []
+    if 'chat_version' not in st.session_state:
+        st.session_state.chat_version = 0
+    
+    # Share the session's chat history list with the OpenAI assistant
+    # This ensures consistency if the engine was recreated, without copying
+    # the history; chat_version changes whenever the history does, so
+    # most reruns only compare two integers
+    engine.openai_assistant.sync_history(
+        st.session_state.chat_messages, st.session_state.chat_version
+    )
+    
+    # Display chat history: older messages are folded into one cached
+    # markdown block, only the most recent ones get their own chat bubbles
+    messages = st.session_state.chat_messages
+    older_count = max(len(messages) - CHAT_RECENT_MESSAGES, 0)
+    if older_count > 0:
+        transcript = st.session_state.get('chat_transcript')
+        if transcript is None or transcript[0] != (st.session_state.chat_version, older_count):
+            transcript = (
+                (st.session_state.chat_version, older_count),
+                "\n\n---\n\n".join(
+                    f"**{'You' if msg['role'] == 'user' else 'Assistant'}:** {msg['content']}"
+                    for msg in messages[:older_count]
+                )
+            )
+            st.session_state.chat_transcript = transcript
+        with st.expander(f"Earlier messages ({older_count})", expanded=False):
+            st.markdown(transcript[1])
+    for msg in messages[older_count:]:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+    
+    # Chat input
+    if prompt := st.chat_input("Ask follow-up questions or have a conversation..."):
+        history_length = len(st.session_state.chat_messages)
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        
+        # Get AI response (the assistant records both messages in the
+        # shared history on success)
+        with st.chat_message("assistant"):
+            with st.spinner("Thinking..."):
+                response = engine.openai_assistant.chat(prompt)
+                st.markdown(response)
+        
+        # Failed calls aren't recorded by the assistant; keep them in history
+        if len(st.session_state.chat_messages) == history_length:
+            st.session_state.chat_messages.append({"role": "user", "content": prompt})
+            st.session_state.chat_messages.append({"role": "assistant", "content": response})
+        st.session_state.chat_version += 1
+    
+    # Clear chat button
+    if len(st.session_state.chat_messages) > 0:
+        if st.button("🗑️ Clear Chat History"):
+            st.session_state.chat_messages = []
+            st.session_state.chat_version += 1
+            engine.openai_assistant.clear_history()
+            st.rerun()
+
+
 def ai_query_page(data):
     """AI natural language query interface."""
     st.header(f"🤖 {t('ai_query_title')}")
@@ -3562,6 +4332,7 @@ def ai_query_page(data):
     
     # Show example queries
     with st.expander("📝 Example Questions You Can Ask"):
+        from ai_query import create_query_examples
         examples = create_query_examples()
         col1, col2 = st.columns(2)
         
@@ -3631,58 +4402,62 @@ def ai_query_page(data):
                         st.markdown("### 🧠 AI Insights")
                         st.markdown(result['gpt_insights'])
                     
+                    # Build the answer table once for both the data view and the chart
+                    answer_data = result.get('data')
+                    if isinstance(answer_data, list) and len(answer_data) > 0:
+                        df_answer = pd.DataFrame(answer_data)
+                    else:
+                        df_answer = None
+                    # Cache key for the answer's table, CSV and chart: the answer is
+                    # determined by the data, the question and the code run for it
+                    answer_key = (get_data_id(), user_query, result.get('code_executed'))
+                    
                     # Show data if available
-                    if 'data' in result and result['data']:
+                    if answer_data:
                         st.subheader(t('detailed_data'))
                         
-                        if isinstance(result['data'], list) and len(result['data']) > 0:
-                            df_result = pd.DataFrame(result['data'])
-                            st.dataframe(format_datetime_columns(df_result), use_container_width=True, hide_index=True)
+                        if df_answer is not None:
+                            data_id, *answer_params = answer_key
+                            st.dataframe(
+                                get_display_table(df_answer, data_id, CURRENT_LANG, 'ai_answer', *answer_params),
+                                use_container_width=True,
+                                hide_index=True
+                            )
                             
                             # Download button
-                            csv = df_result.to_csv(index=False)
+                            csv = get_csv_bytes(df_answer, data_id, 'ai_answer', *answer_params)
                             st.download_button(
                                 "Download Results as CSV",
                                 csv,
                                 f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                                 "text/csv"
                             )
-                        elif isinstance(result['data'], dict):
-                            st.json(result['data'])
+                        elif isinstance(answer_data, dict):
+                            st.json(answer_data)
                     
                     # Show AI-suggested follow-up questions if available
                     if 'suggestions' in result and result.get('ai_powered'):
                         st.markdown("---")
                         st.markdown("### 💭 Suggested Follow-up Questions")
-                        for suggestion in result['suggestions']:
-                            st.write(f"• {suggestion}")
+                        st.markdown("  \n".join(f"• {suggestion}" for suggestion in result['suggestions']))
                     
                     # Show recommendations
                     if 'recommendations' in result and result['recommendations']:
                         st.markdown("---")
                         st.subheader(f"💡 {t('recommendations')}")
-                        for rec in result['recommendations']:
-                            st.info(rec)
+                        st.info("\n\n".join(result['recommendations']))
                     
                     # Visualization
                     if 'viz_type' in result and 'viz_config' in result:
-                        if result['viz_type'] == 'bar_chart' and isinstance(result['data'], list):
-                            df_viz = pd.DataFrame(result['data'])
-                            fig = px.bar(
-                                df_viz,
-                                x=result['viz_config']['x'],
-                                y=result['viz_config']['y'],
-                                title=result['viz_config']['title']
-                            )
-                            st.plotly_chart(fig, width='stretch')
-                        elif result['viz_type'] == 'line_chart' and isinstance(result['data'], list):
-                            df_viz = pd.DataFrame(result['data'])
-                            fig = px.line(
-                                df_viz,
-                                x=result['viz_config']['x'],
-                                y=result['viz_config']['y'],
-                                title=result['viz_config']['title'],
-                                markers=True
+                        if result['viz_type'] in ('bar_chart', 'line_chart') and df_answer is not None:
+                            viz_config = result['viz_config']
+                            fig = build_answer_chart(
+                                df_answer,
+                                answer_key,
+                                result['viz_type'],
+                                viz_config['x'],
+                                viz_config['y'],
+                                viz_config['title']
                             )
                             st.plotly_chart(fig, width='stretch')
                 else:
@@ -3690,56 +4465,13 @@ def ai_query_page(data):
                     
                     if 'suggestions' in result:
                         st.info("**Try these questions:**")
-                        for suggestion in result['suggestions']:
-                            st.write(f"• {suggestion}")
+                        st.markdown("  \n".join(f"• {suggestion}" for suggestion in result['suggestions']))
         else:
             st.warning("Please enter a question")
     
     # GPT Chat Feature (if OpenAI is enabled)
     if engine.openai_enabled:
-        st.markdown("---")
-        st.subheader(t('ai_chat'))
-        st.markdown("Have a conversation with the AI about your sales data")
-        
-        # Initialize chat history in session state
-        if 'chat_messages' not in st.session_state:
-            st.session_state.chat_messages = []
-        
-        # Synchronize session state with OpenAI assistant's internal history
-        # This ensures consistency if the engine was recreated
-        if len(st.session_state.chat_messages) != len(engine.openai_assistant.conversation_history):
-            engine.openai_assistant.conversation_history = st.session_state.chat_messages.copy()
-        
-        # Display chat history
-        for msg in st.session_state.chat_messages:
-            with st.chat_message(msg["role"]):
-                st.markdown(msg["content"])
-        
-        # Chat input
-        if prompt := st.chat_input("Ask follow-up questions or have a conversation..."):
-            # Add user message to history
-            st.session_state.chat_messages.append({"role": "user", "content": prompt})
-            with st.chat_message("user"):
-                st.markdown(prompt)
-            
-            # Get AI response
-            with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    response = engine.openai_assistant.chat(prompt)
-                    st.markdown(response)
-            
-            # Add assistant response to history
-            st.session_state.chat_messages.append({"role": "assistant", "content": response})
-            
-            # Sync back to OpenAI assistant
-            engine.openai_assistant.conversation_history = st.session_state.chat_messages.copy()
-        
-        # Clear chat button
-        if len(st.session_state.chat_messages) > 0:
-            if st.button("🗑️ Clear Chat History"):
-                st.session_state.chat_messages = []
-                engine.openai_assistant.clear_history()
-                st.rerun()
+        ai_chat_panel(engine)
 
 
 def export_page(data):
@@ -3748,53 +4480,103 @@ def export_page(data):
     
     st.subheader(t('generate_reports'))
     
-    report_type = st.selectbox(
+    report_key = st.selectbox(
         t('select_report_type'),
-        [
-            t('sales_summary'),
-            t('customer_analysis'),
-            t('product_performance_report'),
-            t('rfm_segmentation_report'),
-            t('refill_predictions_report'),
-            t('cross_sell_opportunities')
-        ],
+        list(EXPORT_REPORTS),
+        format_func=t,
         key='export_report_type'
     )
+    report_type = t(report_key)
     
     if st.button(t('generate_report')):
         with st.spinner(t('generating_report')):
-            if report_type == t('sales_summary'):
-                analyzer = get_sales_analyzer(data)
-                report_df = analyzer.get_daily_trends()
-            elif report_type == t('customer_analysis'):
-                analyzer = get_customer_analyzer(data)
-                report_df = analyzer.get_customer_summary()
-            elif report_type == t('product_performance_report'):
-                analyzer = get_product_analyzer(data)
-                report_df = analyzer.get_product_summary()
-            elif report_type == t('rfm_segmentation_report'):
-                analyzer = get_rfm_analyzer(data)
-                report_df = analyzer.segment_customers()
-            elif report_type == t('refill_predictions_report'):
-                predictor = get_refill_predictor(data)
-                predictor.calculate_purchase_intervals()
-                report_df = predictor.get_upcoming_refills(30)
-            else:
-                analyzer = get_cross_sell_analyzer(data)
-                report_df = analyzer.analyze_product_affinity()
+            data_id = get_data_id()
+            report_df = EXPORT_REPORTS[report_key](data_id, data)
             
-            # Download button
-            csv = report_df.to_csv(index=False)
-            st.download_button(
-                label=t('download_csv'),
-                data=csv,
-                file_name=f"{report_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
+            # Download buttons
+            file_stem = f"{report_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d')}"
+            csv, parquet = get_report_downloads(report_df, data_id, report_key)
+            col_csv, col_parquet = st.columns(2)
+            with col_csv:
+                st.download_button(
+                    label=t('download_csv'),
+                    data=csv,
+                    file_name=f"{file_stem}.csv",
+                    mime="text/csv"
+                )
+            with col_parquet:
+                if parquet is not None:
+                    st.download_button(
+                        label=t('download_parquet'),
+                        data=parquet,
+                        file_name=f"{file_stem}.parquet",
+                        mime="application/vnd.apache.parquet"
+                    )
             
             st.success(t('report_generated'))
-            report_df_display = translate_columns(report_df.copy())
-            st.dataframe(format_datetime_columns(report_df_display), use_container_width=True, hide_index=True)
+            st.dataframe(
+                get_display_table(report_df, data_id, CURRENT_LANG, 'export', report_key),
+                use_container_width=True,
+                hide_index=True
+            )
+
+
+# Footer markup, built once at import instead of on every rerun
+FOOTER_HTML = """
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Dancing+Script:wght@700&display=swap');
+    
+    .footer-text {
+        color: #d63384;
+        text-align: center;
+        padding: 20px 0;
+        font-family: 'Dancing Script', cursive;
+        font-size: 24px;
+        font-weight: 700;
+    }
+    
+    .footer-text .heart {
+        color: #ff1493;
+        display: inline-block;
+        margin: 0 5px;
+    }
+    
+    /* Only animate the heart for users who haven't asked for reduced motion */
+    @media (prefers-reduced-motion: no-preference) {
+        .footer-text .heart {
+            animation: heartbeat 1.5s ease-in-out infinite;
+        }
+    }
+    
+    @keyframes heartbeat {
+        0% { transform: scale(1); }
+        10% { transform: scale(1.1); }
+        20% { transform: scale(1); }
+        30% { transform: scale(1.1); }
+        40% { transform: scale(1); }
+        100% { transform: scale(1); }
+    }
+    </style>
+    <div class="footer-text">
+        Made with <span class="heart">♥</span> for Dr. Yara
+    </div>
+    """
+
+
+# Sidebar pages keyed by their (untranslated) label key, so the selection
+# survives language switches: key -> (icon, page function)
+PAGES = MappingProxyType({
+    'sales_analysis': ('📊', sales_analysis_page),
+    'Monthly Analysis': ('📅', monthly_analysis_page),
+    'customer_insights': ('👥', customer_analysis_page),
+    'product_performance': ('📦', product_analysis_page),
+    'inventory_management': ('📦', inventory_management_page),
+    'rfm_segmentation': ('🎯', rfm_analysis_page),
+    'refill_prediction': ('💊', refill_prediction_page),
+    'cross_sell_analysis': ('🔗', cross_sell_page),
+    'ai_query': ('🤖', ai_query_page),
+    'export_reports': ('📥', export_page),
+})
 
 
 def main():
@@ -3825,27 +4607,14 @@ def main():
         help="Upload your pharmacy sales data file"
     )
     
-    # Track uploaded file changes and clear cache when new file is uploaded
-    if 'uploaded_file_name' not in st.session_state:
-        st.session_state.uploaded_file_name = None
-    
-    current_file_name = uploaded_file.name if uploaded_file is not None else "default"
-    
-    # Clear all caches when a new file is uploaded
-    if st.session_state.uploaded_file_name != current_file_name:
-        st.session_state.uploaded_file_name = current_file_name
-        # Clear Streamlit's cache
-        st.cache_data.clear()
-        st.cache_resource.clear()
-        st.success(f"🔄 Cache cleared for new data file: {current_file_name}")
-    
-    # Load data
+    # Key the loaded data on the upload's content, so re-uploading an edited
+    # file with the same name is picked up and identical uploads hit the cache
     if uploaded_file is not None:
-        file_path = f"/tmp/{uploaded_file.name}"
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        data, summary = load_and_process_data(file_path)
+        file_digest = hashlib.sha1(uploaded_file.getbuffer()).hexdigest()
+        st.session_state.data_file_key = f"{uploaded_file.name}:{file_digest}"
+        data, summary = load_and_process_data(f"/tmp/{uploaded_file.name}", file_digest, uploaded_file)
     else:
+        st.session_state.data_file_key = "default"
         data, summary = load_and_process_data()
     
     if data is None:
@@ -3857,20 +4626,11 @@ def main():
     st.sidebar.subheader(t('navigation'))
     
     # Menu items with emojis
-    menu_items = [
-        f"📊 {t('sales_analysis')}",
-        f"📅 Monthly Analysis",
-        f"👥 {t('customer_insights')}",
-        f"📦 {t('product_performance')}",
-        f"📦 {t('inventory_management')}",
-        f"🎯 {t('rfm_segmentation')}",
-        f"💊 {t('refill_prediction')}",
-        f"🔗 {t('cross_sell_analysis')}",
-        f"🤖 {t('ai_query')}",
-        f"📥 {t('export_reports')}"
-    ]
-    
-    page = st.sidebar.radio(t('go_to'), menu_items)
+    page = st.sidebar.radio(
+        t('go_to'),
+        list(PAGES),
+        format_func=lambda key: f"{PAGES[key][0]} {t(key)}"
+    )
     
     # Data info
     st.sidebar.markdown("---")
@@ -3884,60 +4644,12 @@ def main():
             **{t('orders')}:** {summary.get('unique_orders', 0):,}
         """)
     
-    # Main content - map menu items to page functions
-    # Extract the key part without emoji for mapping
-    page_functions = [
-        sales_analysis_page,
-        monthly_analysis_page,
-        customer_analysis_page,
-        product_analysis_page,
-        inventory_management_page,
-        rfm_analysis_page,
-        refill_prediction_page,
-        cross_sell_page,
-        ai_query_page,
-        export_page
-    ]
-    
-    # Find which page was selected
-    selected_index = menu_items.index(page)
-    page_functions[selected_index](data)
+    # Main content - render the selected page
+    PAGES[page][1](data)
     
     # Footer with special font
     st.markdown("---")
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Dancing+Script:wght@700&display=swap');
-    
-    .footer-text {
-        color: #d63384;
-        text-align: center;
-        padding: 20px 0;
-        font-family: 'Dancing Script', cursive;
-        font-size: 24px;
-        font-weight: 700;
-    }
-    
-    .footer-text .heart {
-        color: #ff1493;
-        animation: heartbeat 1.5s ease-in-out infinite;
-        display: inline-block;
-        margin: 0 5px;
-    }
-    
-    @keyframes heartbeat {
-        0% { transform: scale(1); }
-        10% { transform: scale(1.1); }
-        20% { transform: scale(1); }
-        30% { transform: scale(1.1); }
-        40% { transform: scale(1); }
-        100% { transform: scale(1); }
-    }
-    </style>
-    <div class="footer-text">
-        Made with <span class="heart">♥</span> for Dr. Yara
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
@@ -40,6 +40,10 @@ class InventoryManager:
         # Merge inventory with sales data
         self.enriched_inventory = self._enrich_inventory()
         
+        # Cache for expensive computations
+        self._abc_analysis_cache: Optional[pd.DataFrame] = None
+        self._abc_summary_cache: Optional[Tuple[pd.Series, pd.Series]] = None
+        
     def _standardize_inventory_columns(self):
         """
         Standardize inventory column names.
@@ -130,7 +134,7 @@ class InventoryManager:
             date_range_days = 1
         
         # Calculate metrics per product
-        metrics = sales_df.groupby('item_code').agg({
+        metrics = sales_df.groupby('item_code', observed=True).agg({
             'quantity': ['sum', 'mean', 'std', 'count'],
             'total': 'sum',
             'date': ['min', 'max']
@@ -392,7 +396,13 @@ class InventoryManager:
         A items: Top 20% items generating ~80% revenue
         B items: Next 30% items generating ~15% revenue  
         C items: Remaining 50% items generating ~5% revenue
+        
+        (CACHED)
         """
+        # Return cached result if available
+        if self._abc_analysis_cache is not None:
+            return self._abc_analysis_cache
+        
         df = self.calculate_reorder_points()
         
         # Sort by total revenue
@@ -414,8 +424,26 @@ class InventoryManager:
         
         df['abc_class'] = df['cumulative_revenue_pct'].apply(assign_class)
         
+        # Cache the result
+        self._abc_analysis_cache = df
+        
         return df
     
+    def get_abc_summary(self) -> Tuple[pd.Series, pd.Series]:
+        """
+        Get item counts and total revenue per ABC class, sorted by class. (CACHED)
+        
+        Returns:
+            Tuple of (item counts, total revenue), both indexed by abc_class
+        """
+        if self._abc_summary_cache is None:
+            abc_df = self.get_abc_analysis()
+            abc_counts = abc_df['abc_class'].value_counts().sort_index()
+            abc_revenue = abc_df.groupby('abc_class', observed=True)['total_revenue'].sum().sort_index()
+            self._abc_summary_cache = (abc_counts, abc_revenue)
+        
+        return self._abc_summary_cache
+    
     def get_category_analysis(self) -> pd.DataFrame:
         """Analyze inventory and sales by category."""
         if 'category' not in self.enriched_inventory.columns:
@@ -433,7 +461,7 @@ class InventoryManager:
             df['inventory_value'] = 0
         
         # Group by category
-        category_stats = df.groupby('category').agg({
+        category_stats = df.groupby('category', observed=True).agg({
             'quantity': 'sum',
             'total_quantity_sold': 'sum',
             'total_revenue': 'sum',
@@ -493,7 +521,7 @@ def create_sample_inventory(sales_data: pd.DataFrame) -> pd.DataFrame:
         Sample inventory DataFrame
     """
     # Get unique products from sales
-    products = sales_data.groupby(['item_code', 'item_name']).agg({
+    products = sales_data.groupby(['item_code', 'item_name'], observed=True).agg({
         'selling_price': 'mean',
         'category': 'first',
         'quantity': 'sum'
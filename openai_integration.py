@@ -44,8 +44,9 @@ class OpenAIAssistant:
         # Initialize OpenAI client if API key is available
         self._initialize_client()
         
-        # Conversation history
+        # Conversation history (history_version tags a list shared by sync_history)
         self.conversation_history = []
+        self.history_version = None
     
     def _initialize_client(self):
         """Initialize OpenAI client with API key."""
@@ -107,10 +108,10 @@ Dataset Summary:
 Available Columns: {', '.join(self.data.columns.tolist())}
 
 Top 5 Products by Revenue:
-{self.data.groupby('item_name')['total'].sum().sort_values(ascending=False).head().to_string()}
+{self.data.groupby('item_name', observed=True)['total'].sum().sort_values(ascending=False).head().to_string()}
 
 Top 5 Customers by Spend:
-{self.data.groupby('customer_name')['total'].sum().sort_values(ascending=False).head().to_string()}
+{self.data.groupby('customer_name', observed=True)['total'].sum().sort_values(ascending=False).head().to_string()}
 """
             return context
         except Exception as e:
@@ -274,7 +275,7 @@ Provide insights and recommendations based on these results."""
             # Get customer summary
             total_spent = customer_data['total'].sum()
             total_orders = customer_data['order_id'].nunique()
-            items_purchased = customer_data.groupby('item_name')['quantity'].sum().sort_values(ascending=False)
+            items_purchased = customer_data.groupby('item_name', observed=True)['quantity'].sum().sort_values(ascending=False)
             
             summary = f"\n**Customer: {customer_name}**\n"
             summary += f"- Total Spent: ${total_spent:,.2f}\n"
@@ -316,7 +317,7 @@ Provide insights and recommendations based on these results."""
             summary += f"- Average Price: ${avg_price:.2f}\n\n"
             summary += "**Top Customers:**\n"
             
-            top_customers = product_data.groupby('customer_name')['total'].sum().sort_values(ascending=False).head(10)
+            top_customers = product_data.groupby('customer_name', observed=True)['total'].sum().sort_values(ascending=False).head(10)
             for customer, spent in top_customers.items():
                 summary += f"- {customer}: ${spent:.2f}\n"
             
@@ -492,6 +493,22 @@ Keep it concise (2-3 sentences)."""
     def clear_history(self):
         """Clear conversation history."""
         self.conversation_history = []
+        self.history_version = None
+    
+    def sync_history(self, messages: List[Dict[str, str]], version: int):
+        """
+        Use an externally kept message list as the conversation history.
+        
+        The list is shared, not copied. Nothing happens if version matches the
+        last synced version.
+        
+        Args:
+            messages: Chat messages as role/content dicts
+            version: Version of the messages, changed whenever they change
+        """
+        if self.history_version != version:
+            self.conversation_history = messages
+            self.history_version = version
     
     def execute_data_query(self, user_query: str) -> Dict[str, Any]:
         """
@@ -583,8 +600,13 @@ Respond ONLY with valid JSON."""
             
             # Execute the code safely
             try:
-                # Create a safe execution environment
-                local_vars = {'df': self.data.copy(), 'pd': pd, 'np': np}
+                # Create a safe execution environment. The generated code gets
+                # categorical columns back as plain objects, so its groupbys and
+                # pivots don't expand to every category combination.
+                df = self.data.astype({
+                    col: object for col in self.data.select_dtypes(include='category').columns
+                })
+                local_vars = {'df': df, 'pd': pd, 'np': np}
                 
                 # Execute the code
                 exec(code, {"__builtins__": {}}, local_vars)
@@ -68,6 +68,7 @@ hiddenimports += collect_submodules('streamlit')
 hiddenimports += collect_submodules('plotly')
 hiddenimports += collect_submodules('pandas')
 hiddenimports += collect_submodules('numpy')
+hiddenimports += collect_submodules('pyarrow')
 hiddenimports += collect_submodules('scipy')
 hiddenimports += collect_submodules('sklearn')
 hiddenimports += collect_submodules('mlxtend')
@@ -55,7 +55,7 @@ class ProductAnalyzer:
         if 'pieces' in sales_data.columns:
             agg_dict['pieces'] = 'sum'
         
-        product_stats = sales_data.groupby(['item_code', 'item_name', 'category']).agg(agg_dict).reset_index()
+        product_stats = sales_data.groupby(['item_code', 'item_name', 'category'], observed=True).agg(agg_dict).reset_index()
         
         # Flatten column names - they come out in the order they're in the dict
         # Order after groupby: order_id, quantity, total, customer_name, date(min), date(max), units*, pieces*
@@ -74,7 +74,7 @@ class ProductAnalyzer:
         product_stats.columns = col_names
         
         # Calculate refund metrics per product
-        product_refunds = refunds_data.groupby(['item_code', 'item_name', 'category']).agg({
+        product_refunds = refunds_data.groupby(['item_code', 'item_name', 'category'], observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'quantity': lambda x: abs(x.sum()),
             'order_id': 'nunique'
@@ -236,7 +236,7 @@ class ProductAnalyzer:
             
             # Get time series for this product
             product_sales = self.data[self.data['item_name'] == item_name].copy()
-            product_sales = product_sales.groupby('date')['quantity'].sum().reset_index()
+            product_sales = product_sales.groupby('date', observed=True)['quantity'].sum().reset_index()
             
             # Classify lifecycle stage
             if days_on_market < 30:
@@ -338,7 +338,7 @@ class ProductAnalyzer:
             return pd.DataFrame()
         
         # Daily aggregation
-        daily_demand = product_data.groupby('date').agg({
+        daily_demand = product_data.groupby('date', observed=True).agg({
             'quantity': 'sum',
             'total': 'sum',
             'order_id': 'nunique'
@@ -357,7 +357,7 @@ class ProductAnalyzer:
     
     def get_category_performance(self) -> pd.DataFrame:
         """Analyze performance by product category."""
-        category_stats = self.data.groupby('category').agg({
+        category_stats = self.data.groupby('category', observed=True).agg({
             'total': 'sum',
             'quantity': 'sum',
             'order_id': 'nunique',
@@ -386,10 +386,10 @@ class ProductAnalyzer:
             return {}
         
         # Monthly patterns
-        monthly = product_data.groupby('month')['quantity'].sum().to_dict()
+        monthly = product_data.groupby('month', observed=True)['quantity'].sum().to_dict()
         
         # Day of week patterns
-        dow = product_data.groupby('day_of_week')['quantity'].sum().to_dict()
+        dow = product_data.groupby('day_of_week', observed=True)['quantity'].sum().to_dict()
         
         return {
             'monthly_patterns': monthly,
@@ -424,7 +424,7 @@ class ProductAnalyzer:
             )
             
             # Compare sales by price category
-            price_impact = product_data.groupby('price_category')['quantity'].sum().to_dict()
+            price_impact = product_data.groupby('price_category', observed=True)['quantity'].sum().to_dict()
             
             product_price_analysis.append({
                 'item_name': item_name,
@@ -444,7 +444,7 @@ class ProductAnalyzer:
         sales_data = self.data[~self.data['is_refund']]
         total_customers = sales_data['customer_name'].nunique()
         
-        product_penetration = sales_data.groupby(['item_code', 'item_name', 'category']).agg({
+        product_penetration = sales_data.groupby(['item_code', 'item_name', 'category'], observed=True).agg({
             'customer_name': 'nunique',
             'total': 'sum',
             'quantity': 'sum'
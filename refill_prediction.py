@@ -27,6 +27,8 @@ class RefillPredictor:
         self.data = data
         self.current_date = data['date'].max()
         self.customer_product_intervals: Optional[pd.DataFrame] = None
+        # Cache for overdue refills, keyed by tolerance_days
+        self._overdue_refills_cache: Dict[int, pd.DataFrame] = {}
         
     def calculate_purchase_intervals(self, include_price_prediction: bool = True) -> pd.DataFrame:
         """
@@ -39,6 +41,9 @@ class RefillPredictor:
         if self.customer_product_intervals is not None:
             return self.customer_product_intervals
         
+        # Results derived from the previous intervals are no longer valid
+        self._overdue_refills_cache = {}
+        
         # Exclude "Unknown Customer" and refunds from refill predictions
         # Unknown customers are walk-ins without identifiable info, so tracking refill patterns is not meaningful
         # Refunds don't represent actual consumption/usage patterns
@@ -53,7 +58,8 @@ class RefillPredictor:
         
         # Group by customer and product
         customer_product_purchases = data_for_refills.groupby(
-            ['customer_name', 'item_code', 'item_name']
+            ['customer_name', 'item_code', 'item_name'],
+            observed=True
         )['date'].apply(list).reset_index()
         
         intervals_data = []
@@ -271,7 +277,7 @@ class RefillPredictor:
     
     def get_overdue_refills(self, tolerance_days: int = 7) -> pd.DataFrame:
         """
-        Identify customers who are overdue for refills.
+        Identify customers who are overdue for refills. (CACHED per tolerance_days)
         
         Args:
             tolerance_days: Grace period after predicted date
@@ -284,6 +290,10 @@ class RefillPredictor:
             self.customer_product_intervals = None
             self.calculate_purchase_intervals()
         
+        # Return cached result if available
+        if tolerance_days in self._overdue_refills_cache:
+            return self._overdue_refills_cache[tolerance_days]
+        
         # Filter overdue refills
         overdue = self.customer_product_intervals[
             self.customer_product_intervals['days_until_predicted'] < -tolerance_days
@@ -333,14 +343,19 @@ class RefillPredictor:
         # Sort by days overdue (most urgent first)
         overdue = overdue.sort_values('days_overdue', ascending=False)
         
-        return overdue[
+        result = overdue[
             ['customer_name', 'item_name', 'first_order_date', 'last_purchase_date', 
-             'predicted_next_purchase', 'days_overdue', 'avg_interval_days',
+             'predicted_next_purchase', 'days_since_last_purchase', 'days_overdue', 'avg_interval_days',
              'num_purchases', 'days_since_first_order', 'customer_status',
              'confidence_score', 'adjusted_confidence', 'churn_probability',
              'predicted_order_value', 'predicted_unit_price', 'predicted_quantity',
              'total_lifetime_value']
         ]
+        
+        # Cache the result
+        self._overdue_refills_cache[tolerance_days] = result
+        
+        return result
     
     def get_upcoming_refills(self, days_ahead: int = 30) -> pd.DataFrame:
         """
@@ -476,7 +491,7 @@ class RefillPredictor:
             self.calculate_purchase_intervals()
         
         # Group by customer
-        customer_compliance = self.customer_product_intervals.groupby('customer_name').agg({
+        customer_compliance = self.customer_product_intervals.groupby('customer_name', observed=True).agg({
             'confidence_score': 'mean',
             'num_purchases': 'sum',
             'avg_interval_days': 'mean',
@@ -633,7 +648,7 @@ class RefillPredictor:
         ].copy()
         
         # Group purchases by month
-        monthly_refills = data_for_analysis.groupby(['month', 'item_name']).agg({
+        monthly_refills = data_for_analysis.groupby(['month', 'item_name'], observed=True).agg({
             'customer_name': 'nunique',
             'quantity': 'sum',
             'total': 'sum'
@@ -3,7 +3,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Optional
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 import config
@@ -23,6 +23,12 @@ class RFMAnalyzer:
         self.current_date = data['date'].max()
         self.rfm_data = None
         self.phone_mapping = None
+        # Cache for expensive computations
+        self._segment_summary_cache: Optional[pd.DataFrame] = None
+        self._rfm_by_category_cache: Optional[pd.DataFrame] = None
+        self._category_segment_summary_cache: Optional[pd.DataFrame] = None
+        self._rfm_by_category_groups_cache: Optional[Dict[str, pd.DataFrame]] = None
+        self._category_summary_groups_cache: Optional[Dict[str, pd.DataFrame]] = None
         
     def calculate_rfm(self) -> pd.DataFrame:
         """
@@ -35,7 +41,7 @@ class RFMAnalyzer:
         sales_data = self.data[~self.data['is_refund']]
         
         # Calculate Recency and Frequency from sales
-        rfm = sales_data.groupby('customer_name').agg({
+        rfm = sales_data.groupby('customer_name', observed=True).agg({
             'date': lambda x: (self.current_date - x.max()).days,  # Recency
             'order_id': 'nunique'  # Frequency (only sales orders)
         }).reset_index()
@@ -44,11 +50,11 @@ class RFMAnalyzer:
         
         # Calculate Monetary value separately to handle refunds
         # Monetary = Total Sales - Total Refunds (net spending)
-        customer_sales = sales_data.groupby('customer_name')['total'].sum().reset_index()
+        customer_sales = sales_data.groupby('customer_name', observed=True)['total'].sum().reset_index()
         customer_sales.columns = ['customer_name', 'gross_spending']
         
         refunds_data = self.data[self.data['is_refund']]
-        customer_refunds = refunds_data.groupby('customer_name')['total'].sum().reset_index()
+        customer_refunds = refunds_data.groupby('customer_name', observed=True)['total'].sum().reset_index()
         customer_refunds.columns = ['customer_name', 'refund_amount']
         customer_refunds['refund_amount'] = abs(customer_refunds['refund_amount'])
         
@@ -124,7 +130,13 @@ class RFMAnalyzer:
         - At Risk: 6+ purchases, but inactive (30-90 days)
         - Lost Customers: Inactive for 90+ days
         - Churned: Previously good customers, now inactive
+        
+        (CACHED)
         """
+        # Return cached result if segments were already assigned
+        if self.rfm_data is not None and 'segment' in self.rfm_data.columns:
+            return self.rfm_data
+        
         if self.rfm_data is None:
             self.calculate_rfm()
         
@@ -170,11 +182,15 @@ class RFMAnalyzer:
         return rfm
     
     def get_segment_summary(self) -> pd.DataFrame:
-        """Get summary statistics for each customer segment."""
+        """Get summary statistics for each customer segment. (CACHED)"""
+        # Return cached result if available
+        if self._segment_summary_cache is not None:
+            return self._segment_summary_cache
+        
         if self.rfm_data is None or 'segment' not in self.rfm_data.columns:
             self.segment_customers()
         
-        segment_summary = self.rfm_data.groupby('segment').agg({
+        segment_summary = self.rfm_data.groupby('segment', observed=True).agg({
             'customer_name': 'count',
             'recency': 'mean',
             'frequency': 'mean',
@@ -194,7 +210,7 @@ class RFMAnalyzer:
         ).round(2)
         
         # Calculate revenue contribution
-        segment_revenue = self.rfm_data.groupby('segment')['monetary'].sum().reset_index()
+        segment_revenue = self.rfm_data.groupby('segment', observed=True)['monetary'].sum().reset_index()
         segment_revenue.columns = ['segment', 'total_revenue']
         segment_summary = segment_summary.merge(segment_revenue, on='segment')
         
@@ -206,6 +222,9 @@ class RFMAnalyzer:
         # Sort by revenue contribution
         segment_summary = segment_summary.sort_values('total_revenue', ascending=False)
         
+        # Cache the result
+        self._segment_summary_cache = segment_summary
+        
         return segment_summary
     
     def get_customers_by_segment(self, segment: str) -> pd.DataFrame:
@@ -435,7 +454,7 @@ class RFMAnalyzer:
     
     def calculate_rfm_by_category(self) -> pd.DataFrame:
         """
-        Calculate RFM metrics for each customer within each category.
+        Calculate RFM metrics for each customer within each category. (CACHED)
         
         This shows customer behavior specific to each product category,
         revealing which customers are Champions/Loyal/At Risk in different categories.
@@ -449,11 +468,15 @@ class RFMAnalyzer:
             - monetary (total spent in this category)
             - segment (RFM segment for this category)
         """
+        # Return cached result if available
+        if self._rfm_by_category_cache is not None:
+            return self._rfm_by_category_cache
+        
         # Use only sales data (exclude refunds)
         sales_data = self.data[~self.data['is_refund']].copy()
         
         # Calculate RFM for each customer-category combination
-        rfm_by_category = sales_data.groupby(['customer_name', 'category']).agg({
+        rfm_by_category = sales_data.groupby(['customer_name', 'category'], observed=True).agg({
             'date': lambda x: (self.current_date - x.max()).days,  # Recency
             'order_id': 'nunique',  # Frequency
             'total': 'sum'  # Monetary
@@ -497,19 +520,26 @@ class RFMAnalyzer:
         # Sort by category and monetary value
         rfm_by_category = rfm_by_category.sort_values(['category', 'monetary'], ascending=[True, False])
         
+        # Cache the result
+        self._rfm_by_category_cache = rfm_by_category
+        
         return rfm_by_category
     
     def get_category_segment_summary(self) -> pd.DataFrame:
         """
-        Get summary of customer segments by category.
+        Get summary of customer segments by category. (CACHED)
         
         Returns:
             DataFrame showing how many customers are in each segment for each category
         """
+        # Return cached result if available
+        if self._category_segment_summary_cache is not None:
+            return self._category_segment_summary_cache
+        
         rfm_by_category = self.calculate_rfm_by_category()
         
         # Count customers by category and segment
-        summary = rfm_by_category.groupby(['category', 'segment']).agg({
+        summary = rfm_by_category.groupby(['category', 'segment'], observed=True).agg({
             'customer_name': 'count',
             'monetary': 'sum',
             'recency': 'mean',
@@ -520,7 +550,7 @@ class RFMAnalyzer:
                           'avg_recency', 'avg_frequency']
         
         # Calculate percentages within each category
-        category_totals = summary.groupby('category')['customer_count'].sum().reset_index()
+        category_totals = summary.groupby('category', observed=True)['customer_count'].sum().reset_index()
         category_totals.columns = ['category', 'category_total']
         
         summary = summary.merge(category_totals, on='category')
@@ -529,8 +559,36 @@ class RFMAnalyzer:
         # Sort by category and revenue
         summary = summary.sort_values(['category', 'total_revenue'], ascending=[True, False])
         
+        # Cache the result
+        self._category_segment_summary_cache = summary
+        
         return summary
     
+    def get_rfm_by_category_groups(self) -> Dict[str, pd.DataFrame]:
+        """
+        Get RFM-by-category results split into one DataFrame per category. (CACHED)
+        
+        Lets callers pick a category with a dict lookup instead of
+        filtering the full customer-category table each time.
+        """
+        if self._rfm_by_category_groups_cache is None:
+            rfm_by_category = self.calculate_rfm_by_category()
+            self._rfm_by_category_groups_cache = {
+                category: group for category, group in rfm_by_category.groupby('category', sort=False, observed=True)
+            }
+        
+        return self._rfm_by_category_groups_cache
+    
+    def get_category_segment_summary_groups(self) -> Dict[str, pd.DataFrame]:
+        """Get the category segment summary split into one DataFrame per category. (CACHED)"""
+        if self._category_summary_groups_cache is None:
+            summary = self.get_category_segment_summary()
+            self._category_summary_groups_cache = {
+                category: group for category, group in summary.groupby('category', sort=False, observed=True)
+            }
+        
+        return self._category_summary_groups_cache
+    
     def get_customers_by_category_segment(self, category: str, segment: str = None) -> pd.DataFrame:
         """
         Get customers in a specific category, optionally filtered by segment.
@@ -572,7 +630,7 @@ class RFMAnalyzer:
         
         # Get top N customers per category
         top_customers = (rfm_by_category
-                        .groupby('category')
+                        .groupby('category', observed=True)
                         .apply(lambda x: x.nlargest(n, 'monetary'))
                         .reset_index(drop=True))
         
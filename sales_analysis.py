@@ -23,6 +23,10 @@ class SalesAnalyzer:
         self._daily_trends_cache: Optional[pd.DataFrame] = None
         self._weekly_trends_cache: Optional[pd.DataFrame] = None
         self._monthly_trends_cache: Optional[pd.DataFrame] = None
+        self._refund_analysis_cache: Optional[Dict] = None
+        self._monthly_category_cache: Optional[pd.DataFrame] = None
+        self._month_comparison_cache: Dict[Tuple[str, str], Dict] = {}
+        self._available_months_cache: Optional[List[str]] = None
         
         # Verify order_id source
         self._verify_order_id_source()
@@ -115,7 +119,7 @@ class SalesAnalyzer:
         net_items = df['quantity'].sum()
         
         # Average order value
-        order_totals = df.groupby('order_id')['total'].sum()
+        order_totals = df.groupby('order_id', observed=True)['total'].sum()
         avg_order_value = order_totals.mean()
         
         # Average items per order (only counting sales)
@@ -168,7 +172,7 @@ class SalesAnalyzer:
         if self._daily_trends_cache is not None:
             return self._daily_trends_cache
         
-        daily = self.data.groupby('date').agg({
+        daily = self.data.groupby('date', observed=True).agg({
             'total': 'sum',
             'order_id': 'nunique',
             'customer_name': 'nunique',
@@ -195,7 +199,7 @@ class SalesAnalyzer:
         df = self.data.copy()
         df['year_week'] = df['date'].dt.strftime('%Y-W%U')
         
-        weekly = df.groupby('year_week').agg({
+        weekly = df.groupby('year_week', observed=True).agg({
             'total': 'sum',
             'order_id': 'nunique',
             'customer_name': 'nunique',
@@ -225,7 +229,7 @@ class SalesAnalyzer:
         refunds_df = df[df['is_refund']].copy()
         
         # Calculate sales metrics
-        monthly_sales = sales_df.groupby('year_month').agg({
+        monthly_sales = sales_df.groupby('year_month', observed=True).agg({
             'total': 'sum',
             'order_id': 'nunique',
             'customer_name': 'nunique',
@@ -235,7 +239,7 @@ class SalesAnalyzer:
         monthly_sales.columns = ['year_month', 'gross_revenue', 'sales_orders', 'customers', 'items_sold', 'month_start']
         
         # Calculate refund metrics
-        monthly_refunds = refunds_df.groupby('year_month').agg({
+        monthly_refunds = refunds_df.groupby('year_month', observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'order_id': 'nunique',
             'quantity': lambda x: abs(x.sum())
@@ -303,7 +307,7 @@ class SalesAnalyzer:
             agg_dict['pieces'] = 'sum'
         
         # Aggregate data
-        top = sales_data.groupby(['item_code', 'item_name']).agg(agg_dict).reset_index()
+        top = sales_data.groupby(['item_code', 'item_name'], observed=True).agg(agg_dict).reset_index()
         
         # Rename columns using dictionary (safer than list assignment)
         rename_dict = {
@@ -369,7 +373,7 @@ class SalesAnalyzer:
         if 'is_service' in filtered_data.columns:
             filtered_data = filtered_data[~filtered_data['is_service']].copy()
         
-        top_cat = filtered_data.groupby('category').agg({
+        top_cat = filtered_data.groupby('category', observed=True).agg({
             'total': 'sum',
             'quantity': 'sum',
             'order_id': 'nunique',
@@ -447,7 +451,7 @@ class SalesAnalyzer:
         df['hour'] = df['hour'].astype(int)
         
         # Group by hour
-        hourly = df.groupby('hour').agg({
+        hourly = df.groupby('hour', observed=True).agg({
             'total': 'sum',
             'order_id': 'nunique',
             'quantity': 'sum'
@@ -475,7 +479,7 @@ class SalesAnalyzer:
     
     def get_day_of_week_patterns(self) -> pd.DataFrame:
         """Analyze sales patterns by day of week."""
-        dow = self.data.groupby('day_name').agg({
+        dow = self.data.groupby('day_name', observed=True).agg({
             'total': 'sum',
             'order_id': 'nunique',
             'customer_name': 'nunique',
@@ -510,7 +514,7 @@ class SalesAnalyzer:
                   not the actual order_id values.
         """
         # Get daily aggregates
-        daily = self.data.groupby('date').agg({
+        daily = self.data.groupby('date', observed=True).agg({
             'total': 'sum',
             'order_id': 'nunique',  # Count of unique orders
             'quantity': 'sum'
@@ -607,14 +611,14 @@ class SalesAnalyzer:
         df = self.data.copy()
         
         # Monthly seasonality
-        monthly_avg = df.groupby('month')['total'].mean().to_dict()
+        monthly_avg = df.groupby('month', observed=True)['total'].mean().to_dict()
         
         # Day of week seasonality
-        dow_avg = df.groupby('day_of_week')['total'].mean().to_dict()
+        dow_avg = df.groupby('day_of_week', observed=True)['total'].mean().to_dict()
         
         # Quarter analysis
         df['quarter'] = df['date'].dt.quarter
-        quarterly = df.groupby('quarter').agg({
+        quarterly = df.groupby('quarter', observed=True).agg({
             'total': ['sum', 'mean'],
             'order_id': 'nunique'
         }).reset_index()
@@ -703,7 +707,7 @@ class SalesAnalyzer:
             method = "Actual Receipt numbers from data"
         
         # Get order size distribution
-        items_per_order = self.data.groupby('order_id').size()
+        items_per_order = self.data.groupby('order_id', observed=True).size()
         
         # Sample orders
         sample_order_ids = self.data['order_id'].unique()[:5]
@@ -784,19 +788,24 @@ class SalesAnalyzer:
     
     def get_refund_analysis(self) -> Dict:
         """
-        Analyze refund patterns and trends.
+        Analyze refund patterns and trends. (CACHED)
         
         Returns detailed refund metrics and insights.
         """
+        # Return cached result if available
+        if self._refund_analysis_cache is not None:
+            return self._refund_analysis_cache
+        
         df = self.data
         sales_df = df[~df['is_refund']]
         refunds_df = df[df['is_refund']]
         
         if len(refunds_df) == 0:
-            return {
+            self._refund_analysis_cache = {
                 'has_refunds': False,
                 'message': 'No refunds found in the data'
             }
+            return self._refund_analysis_cache
         
         # Overall refund metrics
         gross_revenue = sales_df['total'].sum()
@@ -804,14 +813,20 @@ class SalesAnalyzer:
         refund_rate = (refund_amount / gross_revenue * 100) if gross_revenue > 0 else 0
         
         # Refund by time period
-        refunds_by_month = refunds_df.groupby(refunds_df['date'].dt.to_period('M')).agg({
+        refunds_by_month = refunds_df.groupby(refunds_df['date'].dt.to_period('M'), observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'order_id': 'nunique'
         }).reset_index()
         refunds_by_month.columns = ['month', 'refund_amount', 'refund_orders']
+        # 'YYYY-MM' labels from the period's integer fields (Period.__str__ is slow per element)
+        refunds_by_month['month_str'] = [
+            f'{year}-{month:02d}'
+            for year, month in zip(refunds_by_month['month'].dt.year.tolist(),
+                                   refunds_by_month['month'].dt.month.tolist())
+        ]
         
         # Top refunded products
-        top_refunded_products = refunds_df.groupby('item_name').agg({
+        top_refunded_products = refunds_df.groupby('item_name', observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'quantity': lambda x: abs(x.sum()),
             'order_id': 'nunique'
@@ -820,7 +835,7 @@ class SalesAnalyzer:
         top_refunded_products = top_refunded_products.sort_values('refund_amount', ascending=False)
         
         # Customers with most refunds
-        top_refund_customers = refunds_df.groupby('customer_name').agg({
+        top_refund_customers = refunds_df.groupby('customer_name', observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'order_id': 'nunique'
         }).reset_index()
@@ -828,7 +843,7 @@ class SalesAnalyzer:
         top_refund_customers = top_refund_customers.sort_values('refund_amount', ascending=False)
         
         # Refund trends (daily)
-        daily_refunds = refunds_df.groupby('date').agg({
+        daily_refunds = refunds_df.groupby('date', observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'order_id': 'nunique'
         }).reset_index()
@@ -837,7 +852,8 @@ class SalesAnalyzer:
         # Average refund value
         avg_refund_value = refund_amount / len(refunds_df) if len(refunds_df) > 0 else 0
         
-        return {
+        # Cache the result
+        self._refund_analysis_cache = {
             'has_refunds': True,
             'total_refund_amount': refund_amount,
             'total_refund_transactions': len(refunds_df),
@@ -850,10 +866,11 @@ class SalesAnalyzer:
             'refund_orders': refunds_df['order_id'].nunique(),
             'unique_customers_with_refunds': refunds_df['customer_name'].nunique()
         }
+        return self._refund_analysis_cache
     
     def get_monthly_category_breakdown(self) -> pd.DataFrame:
         """
-        Get monthly sales breakdown by category with refund tracking.
+        Get monthly sales breakdown by category with refund tracking. (CACHED)
         
         Returns DataFrame with columns:
         - year_month: Month in YYYY-MM format
@@ -867,6 +884,10 @@ class SalesAnalyzer:
         - refund_quantity: Total quantity refunded
         - net_revenue: Revenue after refunds
         """
+        # Return cached result if available
+        if self._monthly_category_cache is not None:
+            return self._monthly_category_cache
+        
         df = self.data.copy()
         
         # Add month columns
@@ -879,7 +900,7 @@ class SalesAnalyzer:
         refunds_df = df[df['is_refund']].copy()
         
         # Group sales by month and category
-        monthly_sales = sales_df.groupby(['year_month', 'month_name', 'month_start', 'category']).agg({
+        monthly_sales = sales_df.groupby(['year_month', 'month_name', 'month_start', 'category'], observed=True).agg({
             'total': 'sum',
             'quantity': 'sum',
             'order_id': 'nunique'
@@ -888,7 +909,7 @@ class SalesAnalyzer:
                                  'revenue', 'quantity', 'orders']
         
         # Group refunds by month and category
-        monthly_refunds = refunds_df.groupby(['year_month', 'month_start', 'category']).agg({
+        monthly_refunds = refunds_df.groupby(['year_month', 'month_start', 'category'], observed=True).agg({
             'total': lambda x: abs(x.sum()),
             'quantity': lambda x: abs(x.sum())
         }).reset_index()
@@ -920,11 +941,13 @@ class SalesAnalyzer:
         # Sort by month and revenue
         monthly_category = monthly_category.sort_values(['month_start', 'revenue'], ascending=[True, False])
         
+        # Cache the result
+        self._monthly_category_cache = monthly_category
         return monthly_category
     
     def get_month_comparison(self, month1: str, month2: str) -> Dict:
         """
-        Compare two months side by side.
+        Compare two months side by side. (CACHED per month pair)
         
         Args:
             month1: First month in YYYY-MM format (e.g., '2024-01')
@@ -936,6 +959,10 @@ class SalesAnalyzer:
             - Category breakdown for each month
             - Growth rates and changes
         """
+        # Return cached result if available
+        if (month1, month2) in self._month_comparison_cache:
+            return self._month_comparison_cache[(month1, month2)]
+        
         # Exclude refunds
         df = self.data[~self.data['is_refund']].copy()
         df['year_month'] = df['date'].dt.strftime('%Y-%m')
@@ -945,13 +972,14 @@ class SalesAnalyzer:
         month2_data = df[df['year_month'] == month2]
         
         if len(month1_data) == 0 or len(month2_data) == 0:
-            return {
+            self._month_comparison_cache[(month1, month2)] = {
                 'error': f'No data found for one or both months',
                 'month1': month1,
                 'month2': month2,
                 'month1_records': len(month1_data),
                 'month2_records': len(month2_data)
             }
+            return self._month_comparison_cache[(month1, month2)]
         
         # Overall metrics for month 1
         month1_metrics = {
@@ -960,7 +988,7 @@ class SalesAnalyzer:
             'quantity': month1_data['quantity'].sum(),
             'orders': month1_data['order_id'].nunique(),
             'customers': month1_data['customer_name'].nunique(),
-            'avg_order_value': month1_data.groupby('order_id')['total'].sum().mean()
+            'avg_order_value': month1_data.groupby('order_id', observed=True)['total'].sum().mean()
         }
         
         # Overall metrics for month 2
@@ -970,7 +998,7 @@ class SalesAnalyzer:
             'quantity': month2_data['quantity'].sum(),
             'orders': month2_data['order_id'].nunique(),
             'customers': month2_data['customer_name'].nunique(),
-            'avg_order_value': month2_data.groupby('order_id')['total'].sum().mean()
+            'avg_order_value': month2_data.groupby('order_id', observed=True)['total'].sum().mean()
         }
         
         # Calculate changes
@@ -990,7 +1018,7 @@ class SalesAnalyzer:
         }
         
         # Category breakdown for month 1
-        month1_categories = month1_data.groupby('category').agg({
+        month1_categories = month1_data.groupby('category', observed=True).agg({
             'total': 'sum',
             'quantity': 'sum',
             'order_id': 'nunique'
@@ -999,7 +1027,7 @@ class SalesAnalyzer:
         month1_categories = month1_categories.sort_values('revenue', ascending=False)
         
         # Category breakdown for month 2
-        month2_categories = month2_data.groupby('category').agg({
+        month2_categories = month2_data.groupby('category', observed=True).agg({
             'total': 'sum',
             'quantity': 'sum',
             'order_id': 'nunique'
@@ -1013,7 +1041,10 @@ class SalesAnalyzer:
             on='category', 
             how='outer', 
             suffixes=('_m1', '_m2')
-        ).fillna(0)
+        )
+        # Fill only the metric columns (category may be a categorical column)
+        metric_columns = category_comparison.columns.drop('category')
+        category_comparison[metric_columns] = category_comparison[metric_columns].fillna(0)
         
         # Calculate category changes
         category_comparison['revenue_change'] = (
@@ -1027,7 +1058,8 @@ class SalesAnalyzer:
         
         category_comparison = category_comparison.sort_values('revenue_m2', ascending=False)
         
-        return {
+        # Cache the result
+        self._month_comparison_cache[(month1, month2)] = {
             'month1_metrics': month1_metrics,
             'month2_metrics': month2_metrics,
             'changes': changes,
@@ -1035,16 +1067,25 @@ class SalesAnalyzer:
             'month2_categories': month2_categories,
             'category_comparison': category_comparison
         }
+        return self._month_comparison_cache[(month1, month2)]
     
     def get_available_months(self) -> List[str]:
         """
-        Get list of available months in the data.
+        Get list of available months in the data. (CACHED)
         
         Returns:
             List of month strings in YYYY-MM format, sorted chronologically
         """
-        df = self.data.copy()
-        df['year_month'] = df['date'].dt.strftime('%Y-%m')
-        months = sorted(df['year_month'].unique())
+        # Return cached result if available
+        if self._available_months_cache is not None:
+            return self._available_months_cache
+        
+        # Sort the distinct monthly periods and format only those (Period
+        # strings are YYYY-MM), instead of formatting every row's date
+        periods = pd.PeriodIndex(self.data['date'].dt.to_period('M').unique(), freq='M')
+        months = periods.dropna().sort_values().astype(str).tolist()
+        
+        # Cache the result
+        self._available_months_cache = months
         return months
 